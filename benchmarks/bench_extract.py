@@ -0,0 +1,106 @@
+"""Сравнение скорости извлечения данных на сохранённых страницах.
+
+legacy — прежняя схема: до трёх BeautifulSoup(html.parser) на товар и find_all.
+Остальные строки — однопроходный src.extract с каждым установленным парсером.
+
+Запуск из корня репозитория: python benchmarks/bench_extract.py --repeat 50
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extract import available_backends, extract_cards, extract_product  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def legacy_product(html):
+    from bs4 import BeautifulSoup
+    result = {}
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup.find_all('ul', class_='short-specifications'):
+        for spec in element.find_all('li', class_='short-specifications__text'):
+            text = spec.text.strip()
+            if ':' in text:
+                k, v = text.split(':', 1)
+                result[k.strip()] = v.strip()
+    soup = BeautifulSoup(html, 'html.parser')
+    for el in soup.find_all('dl', class_='specifications-list__el'):
+        for spec in el.find_all('dl', class_='specifications-list__spec'):
+            term = spec.find('span', class_='specifications-list__spec-term-text')
+            val = spec.find('dd', class_='specifications-list__spec-definition')
+            if term and val:
+                result[term.text.strip()] = val.text.strip()
+    soup = BeautifulSoup(html, 'html.parser')
+    sellers_table = soup.find('table', class_='sellers-table__self')
+    if sellers_table:
+        for row in sellers_table.find_all('tr'):
+            link_el = row.find('a', href=True)
+            if link_el:
+                price_el = row.find('div', class_='sellers-table__price-cell-text')
+                result[link_el.text.strip()] = re.sub(r'\s+', ' ', price_el.text.replace('\xa0', '')) if price_el else None
+    return result
+
+
+def legacy_listing(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return [product.find(class_='item-card__name') for product in soup.find_all(class_='item-card__info')]
+
+
+def load_corpus(fixtures_dir):
+    corpus = {}
+    for kind in ('products', 'listing'):
+        corpus[kind] = []
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, kind, '**', '*.html'), recursive=True)):
+            with open(path, encoding='utf-8') as f:
+                corpus[kind].append(f.read())
+    return corpus
+
+
+def measure(func, pages, repeat):
+    for html in pages[:1]:
+        func(html)  # прогрев: импорт парсера и компиляция селекторов
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            func(html)
+    return (time.perf_counter() - started) / (repeat * max(1, len(pages))) * 1000
+
+
+def run(fixtures_dir=FIXTURES_DIR, repeat=20):
+    """Возвращает {движок: {'products': мс/стр, 'listing': мс/стр}}."""
+    corpus = load_corpus(fixtures_dir)
+    results = {'legacy': {
+        'products': measure(legacy_product, corpus['products'], repeat),
+        'listing': measure(legacy_listing, corpus['listing'], repeat),
+    }}
+    for name in available_backends():
+        results[name] = {
+            'products': measure(lambda html: extract_product(html, name), corpus['products'], repeat),
+            'listing': measure(lambda html: extract_cards(html, name), corpus['listing'], repeat),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк извлечения данных из HTML")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    results = run(args.fixtures, args.repeat)
+    base = results['legacy']
+    print(f"{'движок':<14}{'товар, мс':>12}{'ускорение':>12}{'каталог, мс':>14}{'ускорение':>12}")
+    for name, row in results.items():
+        print(f"{name:<14}{row['products']:>12.3f}{base['products'] / row['products']:>11.1f}x"
+              f"{row['listing']:>14.3f}{base['listing'] / row['listing']:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
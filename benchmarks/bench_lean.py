@@ -0,0 +1,48 @@
+"""Трафик и время загрузки страниц в обычном и экономном браузере.
+
+Нужны Chrome и доступ к страницам. Пример:
+    python benchmarks/bench_lean.py https://kaspi.kz/shop/p/... https://kaspi.kz/shop/p/... --repeat 3
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.browser_pool import (TrafficStats, blocked_patterns, create_driver, quit_driver,  # noqa: E402
+                              resolve_driver_path)
+
+
+def measure(driver_path, urls, repeat, blocked):
+    stats = TrafficStats()
+    driver = create_driver(driver_path, blocked)
+    try:
+        for _ in range(repeat):
+            for url in urls:
+                driver.get(url)
+                stats.record(driver)
+    finally:
+        quit_driver(driver)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение обычного и экономного режимов браузера")
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--repeat', type=int, default=2)
+    parser.add_argument('--driver', help="путь к chromedriver; по умолчанию закэшированный или через webdriver-manager")
+    args = parser.parse_args()
+
+    driver_path = args.driver or resolve_driver_path()
+
+    before = measure(driver_path, args.urls, args.repeat, None)
+    after = measure(driver_path, args.urls, args.repeat, blocked_patterns())
+    print(f"обычный:    {before.summary()}")
+    print(f"экономный:  {after.summary()}")
+    if before.pages and after.pages and before.bytes and before.load_ms:
+        print(f"экономия трафика {1 - (after.bytes / after.pages) / (before.bytes / before.pages):.0%}, "
+              f"времени загрузки {1 - (after.load_ms / after.pages) / (before.load_ms / before.pages):.0%}")
+
+
+if __name__ == "__main__":
+    main()
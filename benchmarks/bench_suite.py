@@ -0,0 +1,211 @@
+"""Офлайн-бенчмарки парсера на локальной замене kaspi.kz (benchmarks/standin_server.py).
+
+1. Извлечение: мс на страницу товара и каталога для прежней схемы и каждого парсера
+   (см. bench_extract.py).
+2. Полный проход каталога для каждой конфигурации движка: товаров в секунду и пиковая
+   память Python (tracemalloc). Без браузера меряется HTTP-режим с разной
+   параллельностью и с прогретым кэшем; товары, которым нужен браузер, пропускаются
+   и выводятся отдельной колонкой; отдельная конфигурация разбирает HTML в процессах
+   (src/parse_pool.py). С --browser добавляются конфигурации с Chrome,
+   для них пиковая память — RSS Chrome и chromedriver (нужен psutil).
+
+Сеть не нужна. Запуск из корня репозитория:
+    python benchmarks/bench_suite.py --latency 50 --json bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_extract  # noqa: E402
+from standin_server import FIXTURES_DIR, start_server  # noqa: E402
+
+from src.cache import DetailCache  # noqa: E402
+from src.engine import ScrapeEngine  # noqa: E402
+from src.extract import extract_pagination  # noqa: E402
+from src.http_fetch import HttpFetcher  # noqa: E402
+from src.listing import ListingLoader  # noqa: E402
+from src.parse_pool import ParsePool, default_processes  # noqa: E402
+from src.pipeline import DetailPipeline  # noqa: E402
+
+
+def quiet(message, **context):
+    pass
+
+
+class CountingWriter:
+    rows = 0
+
+    def write(self, row):
+        self.rows += 1
+
+
+class OfflinePool:
+    """Пул без браузера: в офлайн-замере товары, которым нужен Selenium, пропускаются."""
+
+    size = 1
+
+    def __init__(self):
+        self.skipped = 0
+
+    def log(self, message):
+        pass
+
+    def run(self, task, item, should_stop=lambda: False):
+        self.skipped += 1
+        return None
+
+
+def crawl_http(url, concurrency, cache=None, processes=0, fields=None):
+    """Проход каталога движком в HTTP-режиме без браузера: (товаров, пропущено)."""
+    writer = CountingWriter()
+    pool = OfflinePool()
+    parser = ParsePool(processes)
+    with HttpFetcher(concurrency=concurrency) as fetcher:
+        engine = ScrapeEngine(url, writer=writer, http_engine=True, http_concurrency=concurrency,
+                              fetcher=fetcher, cache=cache, log=quiet, parser=parser, fields=fields)
+        pipeline = DetailPipeline(pool, engine.browser_details, lambda card, details: writer.write(details),
+                                  fast_task=engine.fast_details, workers=concurrency).start()
+        last_page = 1
+        loader = ListingLoader(pool, None, fetcher=fetcher, workers=min(4, concurrency))
+        for number, page_url, html in loader.pages(url, 1, lambda: last_page):
+            if not html:
+                break
+            cards, _ = parser.cards(html)
+            for card in cards:
+                card['Ссылка'] = urljoin(url, card['Ссылка'])
+                pipeline.put(card)
+            visible, has_next = extract_pagination(html)
+            last_page = max(last_page, visible or 0, number + 1 if has_next else 0)
+        pipeline.finish()
+    parser.close()
+    return writer.rows, pool.skipped
+
+
+def crawl_browser(url, workers, lean):
+    writer = CountingWriter()
+    ScrapeEngine(url, writer=writer, workers=workers, lean=lean, log=quiet, recycle_memory_mb=None).run()
+    return writer.rows, 0
+
+
+def measure_time(func):
+    started = time.perf_counter()
+    products, skipped = func()
+    return products, skipped, time.perf_counter() - started
+
+
+def peak_python_mb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def peak_rss_mb(func):
+    """Пик RSS процесса и всех дочерних (Chrome, chromedriver) во время func()."""
+    try:
+        import psutil
+    except ImportError:
+        func()
+        return None
+    root = psutil.Process()
+    peak, done = [0], threading.Event()
+
+    def sample():
+        while not done.wait(0.2):
+            total = 0
+            for process in [root] + root.children(recursive=True):
+                try:
+                    total += process.memory_info().rss
+                except psutil.Error:
+                    pass
+            peak[0] = max(peak[0], total)
+
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+    try:
+        func()
+    finally:
+        done.set()
+        thread.join()
+    return peak[0] / 1024 / 1024
+
+
+def configurations(url, cache_path, browser):
+    configs = {f"http x{n}": (lambda n=n: crawl_http(url, n), peak_python_mb) for n in (1, 4, 8)}
+
+    def warm_cache():
+        cache = DetailCache(specs_ttl=3600, sellers_ttl=3600, path=cache_path)
+        try:
+            return crawl_http(url, 8, cache)
+        finally:
+            cache.close()
+
+    configs["http x8, только цены"] = (lambda: crawl_http(url, 8, fields=('card', 'sellers')), peak_python_mb)
+    processes = default_processes() or 2
+    configs[f"http x8, разбор x{processes}"] = (lambda: crawl_http(url, 8, processes=processes), peak_python_mb)
+    warm_cache()
+    configs["http x8 + кэш"] = (warm_cache, peak_python_mb)
+    if browser:
+        for workers in (1, 3):
+            for lean in (False, True):
+                name = f"браузер x{workers}{' экономный' if lean else ''}"
+                configs[name] = (lambda w=workers, le=lean: crawl_browser(url, w, le), peak_rss_mb)
+    return configs
+
+
+def run(fixtures_dir=FIXTURES_DIR, category='smartphones', latency=0.05, repeat=20, browser=False):
+    server, base_url = start_server(fixtures_dir=fixtures_dir, latency=latency)
+    url = f"{base_url}/shop/c/{category}/"
+    results = {'extract': bench_extract.run(fixtures_dir, repeat), 'crawl': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (func, memory) in configurations(url, os.path.join(tmp, 'cache.sqlite3'), browser).items():
+            products, skipped, seconds = measure_time(func)
+            results['crawl'][name] = {
+                'products': products,
+                'skipped': skipped,
+                'seconds': round(seconds, 3),
+                'products_per_second': round(products / seconds, 2) if seconds else None,
+                'peak_mb': memory(func),
+            }
+    server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарки извлечения и полного прохода каталога")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--category', default='smartphones')
+    parser.add_argument('--latency', type=float, default=50, help="задержка ответа сервера, мс")
+    parser.add_argument('--repeat', type=int, default=20, help="повторов для замера извлечения")
+    parser.add_argument('--browser', action='store_true', help="добавить конфигурации с Chrome")
+    parser.add_argument('--json', help="сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    results = run(args.fixtures, args.category, args.latency / 1000, args.repeat, args.browser)
+    print(f"{'извлечение':<24}{'товар, мс':>12}{'каталог, мс':>14}")
+    for name, row in results['extract'].items():
+        print(f"{name:<24}{row['products']:>12.3f}{row['listing']:>14.3f}")
+    print()
+    print(f"{'проход каталога':<24}{'товаров':>9}{'пропущено':>11}{'время, с':>10}{'товаров/с':>11}{'пик, МБ':>9}")
+    for name, row in results['crawl'].items():
+        peak = f"{row['peak_mb']:.1f}" if row['peak_mb'] is not None else "—"
+        print(f"{name:<24}{row['products']:>9}{row['skipped']:>11}{row['seconds']:>10.2f}"
+              f"{row['products_per_second'] or 0:>11.1f}{peak:>9}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
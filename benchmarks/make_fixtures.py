@@ -0,0 +1,222 @@
+"""Генератор корпуса страниц для бенчмарков и локального сервера.
+
+Страницы повторяют разметку kaspi.kz, которую читает src.extract: карточки каталога
+с пагинацией, страницы товаров с краткими характеристиками, вкладкой «Характеристики»
+и таблицей продавцов, а также меню, отзывы и данные для скриптов, которые парсер
+должен пропускать. Корпус детерминирован (фиксированный seed) и лежит в
+fixtures/listing/<категория>/page-N.html и fixtures/products/<товар>.html.
+
+Запуск: python benchmarks/make_fixtures.py [--pages 3 --per-page 12]
+"""
+import argparse
+import html
+import json
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+BRANDS = {
+    'Samsung': ['Galaxy A15', 'Galaxy A25', 'Galaxy A55', 'Galaxy S24', 'Galaxy S24 Ultra', 'Galaxy Z Flip5'],
+    'Apple': ['iPhone 13', 'iPhone 14', 'iPhone 15', 'iPhone 15 Pro', 'iPhone 15 Pro Max'],
+    'Xiaomi': ['Redmi 13C', 'Redmi Note 13', 'Redmi Note 13 Pro', 'Poco X6 Pro', '14T'],
+    'realme': ['C53', 'C67', '11 Pro', '12 Pro+'],
+    'HONOR': ['X8b', 'X9b', '90', 'Magic6 Lite'],
+    'Tecno': ['Spark 20', 'Camon 20', 'Pova 5'],
+}
+COLORS = {'черный': 'black', 'белый': 'white', 'синий': 'blue', 'зеленый': 'green', 'фиолетовый': 'violet',
+          'серебристый': 'silver'}
+MEMORY = ['64 ГБ', '128 ГБ', '256 ГБ', '512 ГБ']
+SELLERS = ['Sulpak', 'Technodom', 'Mechta.kz', 'Alser', 'Evrika', 'Shop.kz', 'Beeline Store', 'Fora',
+           'Sotovik', 'Mobile City', 'iSpace', 'Gadget Store']
+MENU = ['Телефоны и гаджеты', 'Бытовая техника', 'ТВ, Аудио, Видео', 'Компьютеры', 'Мебель', 'Красота и здоровье',
+        'Детские товары', 'Аптека', 'Строительство, ремонт', 'Спорт, туризм', 'Досуг, книги', 'Автотовары',
+        'Украшения', 'Аксессуары', 'Одежда', 'Обувь', 'Товары для дома и дачи', 'Подарки, товары для праздников']
+SPEC_GROUPS = {
+    'Основные характеристики': ['Тип', 'Операционная система', 'Количество SIM-карт', 'Тип SIM-карты', 'Год выпуска'],
+    'Экран': ['Диагональ', 'Разрешение', 'Тип матрицы', 'Частота обновления', 'Защитное стекло'],
+    'Память': ['Объем встроенной памяти', 'Объем оперативной памяти', 'Слот для карты памяти'],
+    'Камера': ['Основная камера', 'Фронтальная камера', 'Запись видео', 'Оптическая стабилизация'],
+    'Аккумулятор': ['Емкость аккумулятора', 'Быстрая зарядка', 'Беспроводная зарядка'],
+    'Связь': ['Стандарт связи', 'Wi-Fi', 'Bluetooth', 'NFC'],
+}
+
+
+def page_shell(title, body, rng):
+    menu = "\n".join(f'      <li class="nav__el"><a href="/shop/c/{i}/">{html.escape(name)}</a></li>'
+                     for i, name in enumerate(MENU * 4))
+    state = json.dumps({'ab': {f"exp_{i}": rng.randint(0, 3) for i in range(120)},
+                        'geo': {'city': '750000000', 'name': 'Алматы'}}, ensure_ascii=False)
+    return f"""<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)} - купить в Алматы</title>
+<link rel="stylesheet" href="/static/css/app.css">
+<script src="/static/js/vendor.js" defer></script>
+</head>
+<body>
+<div class="layout">
+  <header class="header"><a class="header__logo" href="/shop/">Kaspi.kz</a>
+    <ul class="nav">
+{menu}
+    </ul>
+  </header>
+{body}
+</div>
+<script>window.BACKEND = {state};</script>
+</body>
+</html>
+"""
+
+
+def make_products(rng, count):
+    products = []
+    for i in range(count):
+        brand = rng.choice(list(BRANDS))
+        model = rng.choice(BRANDS[brand])
+        memory = rng.choice(MEMORY)
+        color = rng.choice(list(COLORS))
+        product_id = 100000000 + rng.randrange(10 ** 8)
+        name = f"Смартфон {brand} {model} {memory} {color}"
+        slug = f"{brand}-{model}-{memory.replace('ГБ', 'gb')}-{COLORS[color]}-{product_id}"
+        slug = slug.lower().replace(' ', '-').replace('+', '-plus')
+        price = rng.randrange(40, 900) * 1000 - 10
+        sellers = []
+        # Примерно у каждого десятого товара продавцы не загрузились: нужен браузер
+        if rng.random() > 0.1:
+            for seller in rng.sample(SELLERS, rng.randint(1, 10)):
+                sellers.append((seller, price + rng.randrange(0, 40) * 500))
+            sellers.sort(key=lambda s: s[1])
+        products.append({
+            'name': name, 'slug': slug, 'price': min([price] + [p for _, p in sellers]),
+            'rating': rng.choice([None, 70, 80, 90, 100]), 'reviews': rng.randrange(0, 3000),
+            'memory': memory, 'sellers': sellers,
+            'groups': {group: rng.sample(specs, rng.randint(2, len(specs)))
+                       for group, specs in rng.sample(list(SPEC_GROUPS.items()), rng.randint(3, len(SPEC_GROUPS)))},
+        })
+    return products
+
+
+def money(value, nbsp=False):
+    text = f"{value:,}".replace(',', '\xa0' if nbsp else ' ')
+    return f"{html.escape(text).replace(chr(0xa0), '&nbsp;')} ₸"
+
+
+def render_listing(products, page, pages, rng):
+    cards = []
+    for p in products:
+        rating = (f'<div class="item-card__rating"><span class="rating _small _{p["rating"]}"></span>'
+                  f'<a href="/shop/p/{p["slug"]}/?tab=reviews">({p["reviews"]} отзывов)</a></div>'
+                  if p['rating'] else '')
+        cards.append(f"""    <div class="item-card">
+      <a class="item-card__image-wrapper" href="/shop/p/{p['slug']}/"><img class="item-card__image" src="/img/{p['slug']}.jpg"></a>
+      <div class="item-card__info">
+        <div class="item-card__name"><a class="item-card__name-link" href="/shop/p/{p['slug']}/">{html.escape(p['name'])}</a></div>
+        {rating}
+        <div class="item-card__prices"><span class="item-card__prices-title">Цена</span><span class="item-card__prices-price">{money(p['price'])}</span></div>
+        <div class="item-card__instalment">от {money(p['price'] // 24)} x 24</div>
+      </div>
+    </div>""")
+    window = range(max(1, page - 2), min(pages, page + 2) + 1)
+    items = [f'    <li class="pagination__el{" _disabled" if page == 1 else ""}">Предыдущая</li>']
+    for n in window:
+        items.append(f'    <li class="pagination__el{" _active" if n == page else ""}">{n}</li>')
+    if pages not in window:
+        items.append('    <li class="pagination__el _dots">…</li>')
+        items.append(f'    <li class="pagination__el">{pages}</li>')
+    items.append(f'    <li class="pagination__el{" _disabled" if page == pages else ""}">Следующая</li>')
+    body = ('  <div class="item-cards-grid">\n' + "\n".join(cards) + '\n  </div>\n'
+            '  <ul class="pagination">\n' + "\n".join(items) + '\n  </ul>')
+    return page_shell("Смартфоны", body, rng)
+
+
+def render_product(p, rng):
+    short = "\n".join(f'        <li class="short-specifications__text">{html.escape(spec)}: {html.escape(value)}</li>'
+                      for spec, value in (('Объем встроенной памяти', p['memory']),
+                                          ('Диагональ', f"{rng.choice([6.1, 6.5, 6.7, 6.8])}\""),
+                                          ('Процессор', rng.choice(['8-ядерный', '6-ядерный'])),
+                                          ('Цвет', p['name'].rsplit(' ', 1)[-1])))
+    rows = "\n".join(f"""            <tr>
+              <td><a href="/shop/info/merchant/{30000000 + SELLERS.index(seller)}/">{html.escape(seller)}</a></td>
+              <td><span class="sellers-table__delivery-price">{rng.choice(['Бесплатно', '1 990 ₸'])}</span></td>
+              <td><div class="sellers-table__price-cell-text">{money(price, nbsp=True)}</div></td>
+            </tr>""" for seller, price in p['sellers'])
+    sellers = (f"""      <div class="sellers-table">
+        <table class="sellers-table__self">
+          <thead><tr><th>Продавец</th><th>Доставка</th><th>Цена</th></tr></thead>
+          <tbody>
+{rows}
+          </tbody>
+        </table>
+      </div>""" if p['sellers'] else '      <div class="sellers-table _loading"></div>')
+    groups = []
+    for group, specs in p['groups'].items():
+        items = "\n".join(f"""          <dl class="specifications-list__spec">
+            <dt class="specifications-list__spec-term"><span class="specifications-list__spec-term-text">{html.escape(spec)}</span></dt>
+            <dd class="specifications-list__spec-definition">{html.escape(rng.choice(['да', 'нет', '2', '4 ГБ', '50 Мп', '5000 мА*ч', '2023']))}</dd>
+          </dl>""" for spec in specs)
+        groups.append(f"""        <dl class="specifications-list__el">
+          <dt class="specifications-list__el-title">{html.escape(group)}</dt>
+{items}
+        </dl>""")
+    reviews = "\n".join(f'      <div class="reviews__review"><div class="reviews__author">Покупатель {i}</div>'
+                        f'<p class="reviews__text">{"Отличный телефон, пользуюсь каждый день. " * rng.randint(1, 6)}</p></div>'
+                        for i in range(rng.randint(3, 12)))
+    body = f"""  <div class="item">
+    <div class="item__heading"><h1 class="item__heading">{html.escape(p['name'])}</h1></div>
+    <div class="item__info">
+      <ul class="short-specifications">
+{short}
+      </ul>
+    </div>
+    <div class="tabs-content">
+      <ul class="tabs-content__headers">
+        <li class="tabs-content__tab _active">Продавцы</li>
+        <li class="tabs-content__tab">Описание</li>
+        <li class="tabs-content__tab">Характеристики</li>
+        <li class="tabs-content__tab">Отзывы</li>
+      </ul>
+{sellers}
+      <div class="specifications-list">
+{chr(10).join(groups)}
+      </div>
+      <div class="reviews">
+{reviews}
+      </div>
+    </div>
+  </div>"""
+    return page_shell(p['name'], body, rng)
+
+
+def generate(fixtures_dir=FIXTURES_DIR, category='smartphones', pages=3, per_page=12, seed=42):
+    rng = random.Random(seed)
+    products = make_products(rng, pages * per_page)
+    listing_dir = os.path.join(fixtures_dir, 'listing', category)
+    products_dir = os.path.join(fixtures_dir, 'products')
+    os.makedirs(listing_dir, exist_ok=True)
+    os.makedirs(products_dir, exist_ok=True)
+    for page in range(1, pages + 1):
+        chunk = products[(page - 1) * per_page:page * per_page]
+        with open(os.path.join(listing_dir, f"page-{page}.html"), 'w', encoding='utf-8') as f:
+            f.write(render_listing(chunk, page, pages, rng))
+    for p in products:
+        with open(os.path.join(products_dir, f"{p['slug']}.html"), 'w', encoding='utf-8') as f:
+            f.write(render_product(p, rng))
+    return len(products)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация корпуса страниц kaspi.kz для офлайн-бенчмарков")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--category', default='smartphones')
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--per-page', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    count = generate(args.fixtures, args.category, args.pages, args.per_page, args.seed)
+    print(f"Страниц каталога: {args.pages}, товаров: {count} -> {args.fixtures}")
+
+
+if __name__ == "__main__":
+    main()
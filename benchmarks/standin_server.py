@@ -0,0 +1,86 @@
+"""Локальная замена kaspi.kz для проверки парсера без сети.
+
+Отдаёт сохранённые страницы из benchmarks/fixtures по тем же путям, что и Kaspi:
+
+    /shop/c/<категория>/?page=N -> fixtures/listing/<категория>/page-N.html
+    /shop/c/<категория>/        -> fixtures/listing/<категория>.html (одна страница)
+    /shop/p/<товар>/            -> fixtures/products/<товар>.html
+
+Параметр --latency добавляет задержку к каждому ответу, чтобы время загрузки было
+ближе к настоящему сайту. Корпус страниц создаёт benchmarks/make_fixtures.py.
+
+Запуск: python benchmarks/standin_server.py --port 8765
+Затем в приложении указать URL http://127.0.0.1:8765/shop/c/smartphones/
+"""
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fixtures_dir = FIXTURES_DIR
+    latency = 0.0
+
+    def resolve(self, path, query):
+        parts = [p for p in path.split('/') if p]
+        if len(parts) == 3 and parts[0] == 'shop' and parts[1] == 'c':
+            pages_dir = os.path.join(self.fixtures_dir, 'listing', parts[2])
+            page = query.get('page', ['1'])[0]
+            if os.path.isdir(pages_dir):
+                return os.path.join(pages_dir, f"page-{page}.html") if page.isdigit() else None
+            return os.path.join(self.fixtures_dir, 'listing', f"{parts[2]}.html") if page == '1' else None
+        if len(parts) == 3 and parts[0] == 'shop' and parts[1] == 'p':
+            return os.path.join(self.fixtures_dir, 'products', f"{parts[2]}.html")
+        return None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        file_path = self.resolve(url.path, parse_qs(url.query))
+        if self.latency:
+            time.sleep(self.latency)
+        if not file_path or not os.path.isfile(file_path):
+            self.send_error(404)
+            return
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, fixtures_dir=FIXTURES_DIR, latency=0.0):
+    """Запускает сервер в фоновом потоке и возвращает (server, base_url). latency — секунды."""
+    handler = type('Handler', (StandinHandler,), {'fixtures_dir': fixtures_dir, 'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная замена kaspi.kz на сохранённых страницах")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0, help="задержка ответа, мс")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.fixtures, args.latency / 1000)
+    print(f"Сервер запущен: {base_url}/shop/c/smartphones/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
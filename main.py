@@ -1,25 +1,22 @@
-import re
 import time
 import threading
+import multiprocessing
 import webbrowser
 import sys
-import pandas as pd
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from bs4 import BeautifulSoup
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
                              QTextEdit, QRadioButton, QButtonGroup, QProgressBar,
-                             QFrame, QMessageBox, QFileDialog)
+                             QFrame, QMessageBox, QFileDialog, QSpinBox, QCheckBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt6.QtGui import QFont, QPalette, QColor
 
+from src.engine import ScrapeEngine
+from src.paths import app_path
+from src.runlog import RunLog
+from src.extract import FIELD_GROUPS
+from src.writers import FORMATS
+
 LANG = {
     'ru': {
         'title': "ParserKaspiFree v 1.0",
@@ -27,9 +24,24 @@ LANG = {
         'start': "Начать парсинг",
         'stop': "Остановить парсинг",
         'save_as': "Формат сохранения:",
+        'workers': "Сессий браузера:",
+        'http_engine': "Быстрый HTTP-режим для карточек товаров",
+        'resume': "Продолжить прерванный запуск",
+        'cache_specs': "Кэш характеристик, ч (0 — выкл.):",
+        'cache_sellers': "Кэш продавцов и цен, мин:",
+        'delta': "Режим дельты: открывать только новые товары и товары с изменившейся ценой или рейтингом",
+        'lean': "Экономный браузер: без картинок, шрифтов, стилей и трекеров",
+        'fields': "Собирать:",
+        'field_card': "Карточка (цена, рейтинг)",
+        'field_specs': "Краткие характеристики",
+        'field_characteristics': "Вкладка «Характеристики»",
+        'field_sellers': "Продавцы и цены",
         'log_label': "Логирование:",
+        'speed': "товаров/мин",
+        'eta': "осталось",
         'contact': "Связаться",
         'error_url': "Пожалуйста, введите корректный URL!",
+        'error_fields': "Выберите хотя бы одну группу полей!",
         'done_msg': "Парсинг завершён. Данные сохранены.",
         'stopped_msg': "Парсинг остановлен пользователем.",
     }
@@ -38,205 +50,33 @@ LANG = {
 current_lang = 'ru'
 
 
-def parse_product_details(driver, link, log_signal):
-    specifications_list, seller_columns, price_columns = [], [], []
-    additional_dict = {}
-    try:
-        driver.execute_script("window.open('', '_blank');")
-        driver.switch_to.window(driver.window_handles[-1])
-        driver.get(link)
-        time.sleep(1)
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-        for element in soup.find_all('ul', class_='short-specifications'):
-            for spec in element.find_all('li', class_='short-specifications__text'):
-                specifications_list.append(spec.text.strip())
-
-        try:
-            next_button = driver.find_elements(By.XPATH,
-                                               '//li[contains(@class, "tabs-content__tab") and contains(text(), "Характеристики")]')
-            if next_button:
-                driver.execute_script("arguments[0].click();", next_button[0])
-                time.sleep(1)
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                for el in soup.find_all('dl', class_='specifications-list__el'):
-                    for spec in el.find_all('dl', class_='specifications-list__spec'):
-                        term = spec.find('span', class_='specifications-list__spec-term-text')
-                        val = spec.find('dd', class_='specifications-list__spec-definition')
-                        if term and val:
-                            additional_dict[term.text.strip()] = val.text.strip()
-        except:
-            pass
-
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        sellers_table = soup.find('table', class_='sellers-table__self')
-        unique_sellers = set()
-        if sellers_table:
-            for row in sellers_table.find_all('tr'):
-                link_el = row.find('a', href=True)
-                if link_el:
-                    name = link_el.text.strip()
-                    price_el = row.find('div', class_='sellers-table__price-cell-text')
-                    price = re.sub(r'\s+', ' ', price_el.text.replace('\xa0', '')) if price_el else None
-                    if name not in unique_sellers:
-                        seller_columns.append(name)
-                        price_columns.append(price)
-                        unique_sellers.add(name)
-
-        specifications_dict = {}
-        for spec in specifications_list:
-            if ':' in spec:
-                k, v = spec.split(':', 1)
-                specifications_dict[k.strip()] = v.strip()
-
-        driver.close()
-        driver.switch_to.window(driver.window_handles[0])
-
-        result = {**specifications_dict, **additional_dict}
-        for i in range(min(len(seller_columns), len(price_columns), 6)):
-            result[f"Seller_{i + 1}"] = seller_columns[i]
-            result[f"Price_{i + 1}"] = price_columns[i]
-        return result
-
-    except Exception as e:
-        log_signal.emit(f"Ошибка парсинга товара: {e}")
-        try:
-            driver.close()
-            driver.switch_to.window(driver.window_handles[0])
-        except:
-            pass
-        return {}
+LOG_MAX_LINES = 2000
+LOG_FLUSH_MS = 250
 
 
 class ScraperThread(QThread):
-    log_signal = pyqtSignal(str)
+    """Поток парсинга. Сообщения не шлются сигналом на каждую строку: они копятся
+    в run_log, и окно забирает их пачками по таймеру."""
     progress_signal = pyqtSignal(bool)
     finished_signal = pyqtSignal()
-    data_ready = pyqtSignal(object, str)
 
-    def __init__(self, url, format_type):
+    def __init__(self, url, format_type, output_path, **options):
         super().__init__()
-        self.url = url
-        self.format_type = format_type
-        self.stop_parsing = False
+        self.run_log = RunLog(capacity=LOG_MAX_LINES, catalog=url)
+        options.setdefault('metrics_path', app_path('last_run_metrics.json'))
+        self.engine = ScrapeEngine(url, format_type, output_path, log=self.run_log, **options)
 
     def stop(self):
-        self.stop_parsing = True
-        self.log_signal.emit("Получен сигнал остановки парсинга...")
+        self.engine.stop()
 
     def run(self):
         self.progress_signal.emit(True)
-
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-plugins")
-        options.add_argument("--disable-web-security")
-        options.add_argument("--allow-running-insecure-content")
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.implicitly_wait(3)
-        driver.set_page_load_timeout(15)
-
-        data = []
-
         try:
-            driver.get(self.url)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "item-card__info"))
-            )
+            self.engine.run()
         except Exception as e:
-            self.log_signal.emit(f"Ошибка загрузки: {e}")
-            self.progress_signal.emit(False)
-            driver.quit()
-            self.finished_signal.emit()
-            return
-
-        page_num = 1
-
-        while not self.stop_parsing:
-            try:
-                WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "item-card__info"))
-                )
-
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                products = soup.find_all(class_='item-card__info')
-
-                if not products:
-                    self.log_signal.emit("Товары не найдены на текущей странице")
-                    break
-
-                for product in products:
-                    if self.stop_parsing:
-                        break
-                    try:
-                        title = product.find(class_='item-card__name').text.strip()
-                        rel_link = product.find('a', class_='item-card__name-link')['href']
-                        link = f"https://kaspi.kz{rel_link}"
-                        price = product.find('span', class_='item-card__prices-price').text.strip()
-                        rating_el = product.find(class_='item-card__rating')
-                        rating = rating_el.text.strip() if rating_el else 'Нет рейтинга'
-
-                        details = parse_product_details(driver, link, self.log_signal)
-                        product_data = {
-                            'Название': title,
-                            'Ссылка': link,
-                            'Цена': price,
-                            'Рейтинг': rating,
-                            **details,
-                        }
-                        data.append(product_data)
-                        self.log_signal.emit(f"Собран товар: {title}")
-
-                    except Exception as e:
-                        self.log_signal.emit(f"Ошибка: {e}")
-
-                if self.stop_parsing:
-                    self.log_signal.emit("Остановка парсинга после текущей страницы...")
-                    break
-
-                try:
-                    next_button = driver.find_elements(By.XPATH,
-                                                       '//li[contains(@class, "pagination__el") and contains(text(), "Следующая")]')
-                    if next_button and 'disabled' not in next_button[0].get_attribute('class'):
-                        driver.execute_script("arguments[0].click();", next_button[0])
-                        page_num += 1
-                        self.log_signal.emit(f"Переход на страницу {page_num}")
-                        time.sleep(2)
-                    else:
-                        self.log_signal.emit("Достигнута последняя страница.")
-                        break
-                except Exception:
-                    break
-
-            except Exception as e:
-                self.log_signal.emit(f"Ошибка на странице {page_num}: {e}")
-                break
-
+            self.run_log(f"Ошибка: {e}")
+        self.run_log.close()
         self.progress_signal.emit(False)
-
-        if data:
-            df = pd.DataFrame(data)
-            self.log_signal.emit(f"Собрано товаров: {len(data)}")
-            self.data_ready.emit(df, self.format_type)
-        else:
-            self.log_signal.emit("Нет данных для сохранения.")
-
-        if self.stop_parsing:
-            self.log_signal.emit(LANG[current_lang]['stopped_msg'])
-
-        try:
-            driver.quit()
-        except Exception as e:
-            self.log_signal.emit(f"Ошибка при закрытии драйвера: {e}")
-
         self.finished_signal.emit()
 
 
@@ -445,7 +285,7 @@ class KaspiParser(QMainWindow):
         format_layout = QHBoxLayout()
         self.format_group = QButtonGroup()
 
-        for i, fmt in enumerate(['xlsx', 'csv', 'json']):
+        for i, fmt in enumerate(FORMATS):
             radio = QRadioButton(fmt.upper())
             radio.setFont(QFont("Segoe UI", 12))
             self.format_group.addButton(radio, i)
@@ -454,8 +294,74 @@ class KaspiParser(QMainWindow):
                 radio.setChecked(True)
 
         format_layout.addStretch()
+
+        workers_label = QLabel(LANG[current_lang]['workers'])
+        workers_label.setFont(QFont("Segoe UI", 12))
+        format_layout.addWidget(workers_label)
+
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 8)
+        self.workers_spin.setValue(3)
+        self.workers_spin.setFont(QFont("Segoe UI", 12))
+        format_layout.addWidget(self.workers_spin)
+
         layout.addLayout(format_layout)
 
+        self.http_checkbox = QCheckBox(LANG[current_lang]['http_engine'])
+        self.http_checkbox.setFont(QFont("Segoe UI", 12))
+        layout.addWidget(self.http_checkbox)
+
+        self.resume_checkbox = QCheckBox(LANG[current_lang]['resume'])
+        self.resume_checkbox.setFont(QFont("Segoe UI", 12))
+        layout.addWidget(self.resume_checkbox)
+
+        self.delta_checkbox = QCheckBox(LANG[current_lang]['delta'])
+        self.delta_checkbox.setFont(QFont("Segoe UI", 12))
+        layout.addWidget(self.delta_checkbox)
+
+        self.lean_checkbox = QCheckBox(LANG[current_lang]['lean'])
+        self.lean_checkbox.setFont(QFont("Segoe UI", 12))
+        layout.addWidget(self.lean_checkbox)
+
+        # Группы полей: без характеристик и продавцов страницы товаров открываются быстрее
+        fields_layout = QHBoxLayout()
+        fields_label = QLabel(LANG[current_lang]['fields'])
+        fields_label.setFont(QFont("Segoe UI", 12))
+        fields_layout.addWidget(fields_label)
+        self.field_checkboxes = {}
+        for group in FIELD_GROUPS:
+            checkbox = QCheckBox(LANG[current_lang][f'field_{group}'])
+            checkbox.setFont(QFont("Segoe UI", 12))
+            checkbox.setChecked(True)
+            fields_layout.addWidget(checkbox)
+            self.field_checkboxes[group] = checkbox
+        fields_layout.addStretch()
+        layout.addLayout(fields_layout)
+
+        cache_layout = QHBoxLayout()
+        cache_specs_label = QLabel(LANG[current_lang]['cache_specs'])
+        cache_specs_label.setFont(QFont("Segoe UI", 12))
+        cache_layout.addWidget(cache_specs_label)
+
+        self.cache_specs_spin = QSpinBox()
+        self.cache_specs_spin.setRange(0, 24 * 30)
+        self.cache_specs_spin.setValue(0)
+        self.cache_specs_spin.setFont(QFont("Segoe UI", 12))
+        cache_layout.addWidget(self.cache_specs_spin)
+
+        cache_sellers_label = QLabel(LANG[current_lang]['cache_sellers'])
+        cache_sellers_label.setFont(QFont("Segoe UI", 12))
+        cache_layout.addWidget(cache_sellers_label)
+
+        self.cache_sellers_spin = QSpinBox()
+        self.cache_sellers_spin.setRange(0, 24 * 60)
+        self.cache_sellers_spin.setValue(0)
+        self.cache_sellers_spin.setFont(QFont("Segoe UI", 12))
+        cache_layout.addWidget(self.cache_sellers_spin)
+
+        cache_layout.addStretch()
+        layout.addLayout(cache_layout)
+
         # Кнопки управления
         button_layout = QHBoxLayout()
 
@@ -485,8 +391,15 @@ class KaspiParser(QMainWindow):
         self.log_text = QTextEdit()
         self.log_text.setFont(QFont("Consolas", 11))
         self.log_text.setReadOnly(True)
+        # Окно хранит только последние строки, полный лог — в файле RunLog
+        self.log_text.document().setMaximumBlockCount(LOG_MAX_LINES)
         layout.addWidget(self.log_text)
 
+        # Лог и прогресс обновляются по таймеру, а не сигналом на каждый товар
+        self.ui_timer = QTimer(self)
+        self.ui_timer.setInterval(LOG_FLUSH_MS)
+        self.ui_timer.timeout.connect(self.refresh_status)
+
     def open_contact(self):
         webbrowser.open('https://t.me/Userspoi')
 
@@ -494,9 +407,47 @@ class KaspiParser(QMainWindow):
         timestamp = time.strftime("%H:%M:%S")
         self.log_text.append(f"[{timestamp}] {message}")
 
+    def flush_log(self):
+        """Переносит накопленные строки лога парсинга в окно одной вставкой"""
+        if not self.scraper_thread:
+            return
+        lines, dropped = self.scraper_thread.run_log.drain()
+        if dropped:
+            lines.insert(0, f"... пропущено строк лога: {dropped} (полный лог: {self.scraper_thread.run_log.path})")
+        if lines:
+            self.log_text.append("\n".join(lines))
+
+    def update_progress(self):
+        """Прогресс по оценке объёма каталога, скорость и оставшееся время"""
+        if not self.scraper_thread:
+            return
+        done, expected, per_minute, eta = self.scraper_thread.engine.progress()
+        if not expected:
+            return
+        text = f"%v / %m · {per_minute:.0f} {LANG[current_lang]['speed']}"
+        if eta is not None:
+            text += f" · {LANG[current_lang]['eta']} {time.strftime('%H:%M:%S', time.gmtime(eta))}"
+        self.progress_bar.setRange(0, expected)
+        self.progress_bar.setValue(min(done, expected))
+        self.progress_bar.setFormat(text)
+
+    def refresh_status(self):
+        self.flush_log()
+        self.update_progress()
+
     def get_selected_format(self):
-        formats = ['xlsx', 'csv', 'json']
-        return formats[self.format_group.checkedId()]
+        return list(FORMATS)[self.format_group.checkedId()]
+
+    def ask_output_path(self, format_type):
+        """Выбор файла для сохранения до запуска: строки пишутся в него по мере парсинга"""
+        file_filter, default_name = FORMATS[format_type]
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Сохранить файл",
+            default_name,
+            file_filter
+        )
+        return file_path
 
     def start_parsing(self):
         url = self.url_entry.text().strip()
@@ -504,17 +455,33 @@ class KaspiParser(QMainWindow):
             QMessageBox.warning(self, "Ошибка", LANG[current_lang]['error_url'])
             return
 
-        self.start_btn.setEnabled(False)
-        self.stop_btn.setEnabled(True)
+        fields = [group for group, checkbox in self.field_checkboxes.items() if checkbox.isChecked()]
+        if not fields:
+            QMessageBox.warning(self, "Ошибка", LANG[current_lang]['error_fields'])
+            return
 
         format_type = self.get_selected_format()
+        output_path = self.ask_output_path(format_type)
+        if not output_path:
+            self.log_message("Сохранение отменено пользователем")
+            return
+
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
 
-        self.scraper_thread = ScraperThread(url, format_type)
-        self.scraper_thread.log_signal.connect(self.log_message)
+        self.scraper_thread = ScraperThread(url, format_type, output_path,
+                                            workers=self.workers_spin.value(),
+                                            http_engine=self.http_checkbox.isChecked(),
+                                            resume=self.resume_checkbox.isChecked(),
+                                            cache_specs_ttl=self.cache_specs_spin.value() * 3600,
+                                            cache_sellers_ttl=self.cache_sellers_spin.value() * 60,
+                                            delta=self.delta_checkbox.isChecked(),
+                                            lean=self.lean_checkbox.isChecked(),
+                                            fields=fields)
         self.scraper_thread.progress_signal.connect(self.toggle_progress)
         self.scraper_thread.finished_signal.connect(self.parsing_finished)
-        self.scraper_thread.data_ready.connect(self.save_data)
         self.scraper_thread.start()
+        self.ui_timer.start()
 
     def stop_parsing(self):
         if self.scraper_thread and self.scraper_thread.isRunning():
@@ -525,51 +492,15 @@ class KaspiParser(QMainWindow):
 
     def toggle_progress(self, show):
         if show:
+            self.progress_bar.setRange(0, 0)  # пока объём каталога неизвестен
             self.progress_bar.show()
         else:
             self.progress_bar.hide()
 
-    def save_data(self, df, format_type):
-        """Сохранение данных через диалог выбора файла (как в исходном коде)"""
-        try:
-            # Определяем фильтры файлов
-            if format_type == 'xlsx':
-                file_filter = "Excel files (*.xlsx)"
-                default_name = "kaspi_data.xlsx"
-            elif format_type == 'csv':
-                file_filter = "CSV files (*.csv)"
-                default_name = "kaspi_data.csv"
-            elif format_type == 'json':
-                file_filter = "JSON files (*.json)"
-                default_name = "kaspi_data.json"
-
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Сохранить файл",
-                default_name,
-                file_filter
-            )
-
-            if file_path:
-                self.log_message("Сохранение файла...")
-                if format_type == 'xlsx':
-                    df.to_excel(file_path, index=False)
-                elif format_type == 'csv':
-                    df.to_csv(file_path, index=False)
-                elif format_type == 'json':
-                    df.to_json(file_path, orient='records', force_ascii=False)
-
-                self.log_message(LANG[current_lang]['done_msg'])
-                self.log_message(f"Файл сохранен: {file_path}")
-            else:
-                self.log_message("Сохранение отменено пользователем")
-
-        except Exception as e:
-            self.log_message(f"Ошибка сохранения: {e}")
-            QMessageBox.critical(self, "Ошибка сохранения", f"Не удалось сохранить файл:\n{str(e)}")
-
     def parsing_finished(self):
         """Обработка завершения парсинга"""
+        self.ui_timer.stop()
+        self.refresh_status()
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.progress_bar.hide()
@@ -577,6 +508,8 @@ class KaspiParser(QMainWindow):
 
 
 def main():
+    # Разбор HTML идёт в дочерних процессах (src/parse_pool.py); нужно для сборки в exe
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
 
     app.setApplicationName("ParserKaspiFree v 1.0")
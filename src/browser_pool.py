@@ -0,0 +1,319 @@
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+from src.paths import app_path
+
+DRIVER_CACHE = 'chromedriver.json'
+
+
+BLOCK_LISTS = {
+    'images': ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    'media': ["*.mp4", "*.webm", "*.m3u8", "*.mp3"],
+    'fonts': ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    'stylesheets': ["*.css"],
+    'trackers': [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*mc.yandex.ru*", "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*",
+        "*criteo.com*", "*tiktok.com*", "*vk.com/rtrg*", "*top-fwz1.mail.ru*",
+    ],
+}
+
+# Значение 2 в настройках контента Chrome — «запретить»
+LEAN_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.managed_default_content_settings.media_stream': 2,
+    'profile.managed_default_content_settings.notifications': 2,
+    'profile.managed_default_content_settings.geolocation': 2,
+}
+
+PAGE_STATS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+const end = nav ? (nav.loadEventEnd || nav.domContentLoadedEventEnd || performance.now()) : 0;
+return {bytes: bytes, load_ms: nav ? end - nav.startTime : 0, requests: resources.length + 1};
+"""
+
+
+def blocked_patterns(categories=None, extra=()):
+    """Шаблоны URL для блокировки: выбранные категории BLOCK_LISTS плюс свои шаблоны."""
+    patterns = []
+    for category in categories if categories is not None else BLOCK_LISTS:
+        patterns.extend(BLOCK_LISTS[category])
+    patterns.extend(extra)
+    return patterns
+
+
+def build_chrome_options(lean=False):
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-plugins")
+    options.add_argument("--disable-web-security")
+    options.add_argument("--allow-running-insecure-content")
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+    # Не ждём загрузки всех ресурсов: нужные элементы дожидаемся явно (src/waits.py)
+    options.page_load_strategy = 'eager'
+    if lean:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option("prefs", LEAN_PREFS)
+    return options
+
+
+def resolve_driver_path(refresh=False):
+    """Путь к chromedriver без обращения к сети, если он уже скачан.
+
+    webdriver-manager при каждом install() проверяет версию по сети, поэтому найденный
+    путь сохраняется в DRIVER_CACHE. refresh=True заново определяет и скачивает драйвер.
+    """
+    cache_path = app_path(DRIVER_CACHE)
+    if not refresh:
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                path = json.load(f)['path']
+            if os.path.isfile(path):
+                return path
+        except (OSError, ValueError, KeyError):
+            pass
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({'path': path, 'resolved_at': time.time()}, f)
+    return path
+
+
+def launch_driver(blocked=None, log=None):
+    """Первый Chrome запуска: возвращает (driver, driver_path).
+
+    Если Chrome обновился и закэшированный chromedriver к нему больше не подходит,
+    драйвер определяется заново.
+    """
+    driver_path = resolve_driver_path()
+    try:
+        return create_driver(driver_path, blocked), driver_path
+    except SessionNotCreatedException:
+        if log:
+            log("Версия chromedriver не подходит к Chrome, загружаем новую...")
+        driver_path = resolve_driver_path(refresh=True)
+        return create_driver(driver_path, blocked), driver_path
+
+
+def create_driver(driver_path, blocked=None):
+    """Новый Chrome. Если передан список blocked, браузер работает в экономном режиме:
+    без картинок и медиа, а запросы по шаблонам blocked отбрасываются."""
+    driver = webdriver.Chrome(service=Service(driver_path), options=build_chrome_options(lean=bool(blocked)))
+    driver.set_page_load_timeout(15)
+    driver.blocked_urls = list(blocked or [])
+    apply_request_blocking(driver)
+    return driver
+
+
+def apply_request_blocking(driver):
+    """Блокировка через CDP действует на текущую вкладку: при открытии новой вкладки
+    её нужно включать заново."""
+    if getattr(driver, 'blocked_urls', None):
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': driver.blocked_urls})
+
+
+class TrafficStats:
+    """Сколько байт скачано и сколько грузились страницы (по Performance API браузера)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.bytes = 0
+        self.load_ms = 0.0
+        self.requests = 0
+
+    def record(self, driver):
+        try:
+            stats = driver.execute_script(PAGE_STATS_JS)
+        except WebDriverException:
+            return
+        with self._lock:
+            self.pages += 1
+            self.bytes += int(stats.get('bytes') or 0)
+            self.load_ms += float(stats.get('load_ms') or 0)
+            self.requests += int(stats.get('requests') or 0)
+
+    def summary(self):
+        if not self.pages:
+            return "нет данных"
+        return (f"страниц {self.pages}, {self.bytes / 1024 / 1024:.1f} МБ "
+                f"({self.bytes / 1024 / self.pages:.0f} КБ на страницу), "
+                f"запросов на страницу {self.requests / self.pages:.0f}, "
+                f"среднее время загрузки {self.load_ms / self.pages:.0f} мс")
+
+
+def is_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+# driver_memory_mb без psutil: в отличие от None («процесс не нашёлся») проверять больше нечем
+NO_PSUTIL = object()
+
+
+def driver_memory_mb(driver):
+    """Память chromedriver и всех процессов Chrome сессии, МБ.
+
+    NO_PSUTIL, если psutil не установлен; None, если процессы сессии не удалось найти.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return NO_PSUTIL
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 1024 / 1024
+
+
+class BrowserPool:
+    """Пул прогретых сессий Chrome для параллельного парсинга карточек товаров.
+
+    Каждая сессия работает в одной вкладке. Чтобы память не росла на длинных запусках,
+    сессия перезапускается после max_pages страниц или когда Chrome занял больше
+    max_memory_mb (проверяется раз в memory_check_every страниц, нужен psutil).
+    """
+
+    def __init__(self, factory, size=3, log=None, retries=1, max_pages=None, max_memory_mb=None,
+                 memory_check_every=10):
+        self.factory = factory
+        self.size = max(1, size)
+        self.retries = retries
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_every = max(1, memory_check_every)
+        self.log = log or (lambda message: None)
+        self.recycled = 0
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._alive = 0
+        self._pages = {}
+
+    def start(self):
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self.factory) for _ in range(self.size)]
+            for future in futures:
+                try:
+                    self._idle.put(future.result())
+                    self._alive += 1
+                except Exception as e:
+                    self.log(f"Не удалось запустить сессию браузера: {e}")
+        if not self._alive:
+            raise RuntimeError("Не удалось запустить ни одной сессии браузера")
+        self.log(f"Запущено сессий браузера: {self._alive}")
+        return self
+
+    def close(self):
+        while True:
+            try:
+                quit_driver(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        self._alive = 0
+        self._pages.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                if not self._alive:
+                    raise RuntimeError("Нет доступных сессий браузера")
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def _replace(self, driver, reason="Сессия браузера упала, запускаем новую..."):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        quit_driver(driver)
+        self.log(reason)
+        try:
+            self._idle.put(self.factory())
+        except Exception as e:
+            with self._lock:
+                self._alive -= 1
+            self.log(f"Не удалось перезапустить сессию браузера: {e}")
+
+    def _worn_out(self, driver):
+        """Причина перезапуска отработавшей сессии или None."""
+        with self._lock:
+            pages = self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+        if self.max_pages and pages >= self.max_pages:
+            return f"Сессия браузера открыла {pages} страниц, перезапускаем..."
+        if self.max_memory_mb and pages % self.memory_check_every == 0:
+            memory = driver_memory_mb(driver)
+            if memory is NO_PSUTIL:
+                self.log("psutil не установлен, контроль памяти браузера отключён")
+                self.max_memory_mb = None
+            elif memory is not None and memory > self.max_memory_mb:
+                return f"Сессия браузера заняла {memory:.0f} МБ, перезапускаем..."
+        return None
+
+    def _release(self, driver):
+        reason = self._worn_out(driver)
+        if reason:
+            self.recycled += 1
+            self._replace(driver, reason)
+        else:
+            self._idle.put(driver)
+
+    def run(self, task, item, should_stop=lambda: False):
+        result = None
+        for _ in range(self.retries + 1):
+            if should_stop():
+                return None
+            driver = self._acquire()
+            try:
+                result = task(driver, item)
+            except Exception as e:
+                self.log(f"Ошибка в сессии браузера: {e}")
+                result = {}
+            if is_alive(driver):
+                self._release(driver)
+                return result
+            self._replace(driver)
+        return result
@@ -0,0 +1,108 @@
+import json
+import sqlite3
+import threading
+import time
+
+from src.paths import app_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS details (
+    link TEXT PRIMARY KEY,
+    specs TEXT,
+    specs_at REAL,
+    sellers TEXT,
+    sellers_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS details_accessed ON details (accessed_at);
+"""
+
+
+class DetailCache:
+    """Кэш страниц товаров на диске по URL.
+
+    Характеристики и блок продавцов/цен хранятся с отдельным временем жизни: пока
+    характеристики свежие, на странице товара нужно обновить только продавцов.
+    При превышении max_entries удаляются записи, к которым дольше всего не обращались.
+    """
+
+    def __init__(self, specs_ttl=7 * 24 * 3600, sellers_ttl=0, max_entries=50000, path=None):
+        self.specs_ttl = specs_ttl
+        self.sellers_ttl = sellers_ttl
+        self.max_entries = max_entries
+        self.path = path or app_path('cache.sqlite3')
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM details").fetchone()[0]
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+
+    def get(self, link):
+        """Закэшированная страница с флагами specs_fresh/sellers_fresh или None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT specs, specs_at, sellers, sellers_at FROM details WHERE link = ?",
+                                     (link,)).fetchone()
+            if not row:
+                return None
+            self._conn.execute("UPDATE details SET accessed_at = ? WHERE link = ?", (now, link))
+            self._conn.commit()
+        specs, specs_at, sellers, sellers_at = row
+        specs = json.loads(specs) if specs else {'specifications': {}, 'characteristics': {}}
+        return {
+            'specifications': specs['specifications'],
+            'characteristics': specs['characteristics'],
+            'sellers': [tuple(s) for s in json.loads(sellers)] if sellers else [],
+            'specs_fresh': bool(specs_at) and now - specs_at < self.specs_ttl,
+            'sellers_fresh': bool(sellers_at) and now - sellers_at < self.sellers_ttl,
+        }
+
+    def put(self, link, page, specs=True, sellers=True):
+        """Сохраняет страницу; specs=False обновляет только продавцов, не трогая характеристики."""
+        now = time.time()
+        specs_json = json.dumps({'specifications': page['specifications'],
+                                 'characteristics': page['characteristics']}, ensure_ascii=False)
+        sellers_json = json.dumps(page['sellers'], ensure_ascii=False)
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM details WHERE link = ?", (link,)).fetchone()
+            if exists:
+                if specs:
+                    self._conn.execute("UPDATE details SET specs = ?, specs_at = ? WHERE link = ?",
+                                       (specs_json, now, link))
+                if sellers:
+                    self._conn.execute("UPDATE details SET sellers = ?, sellers_at = ? WHERE link = ?",
+                                       (sellers_json, now, link))
+                self._conn.execute("UPDATE details SET accessed_at = ? WHERE link = ?", (now, link))
+            else:
+                self._conn.execute(
+                    "INSERT INTO details (link, specs, specs_at, sellers, sellers_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (link, specs_json if specs else None, now if specs else None,
+                     sellers_json if sellers else None, now if sellers else None, now))
+                self._size += 1
+                if self._size > self.max_entries:
+                    self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Удаляем с запасом в 10%, чтобы не чистить кэш на каждой новой записи
+        excess = self._size - int(self.max_entries * 0.9)
+        self._conn.execute("DELETE FROM details WHERE link IN "
+                           "(SELECT link FROM details ORDER BY accessed_at LIMIT ?)", (excess,))
+        self._size -= excess
+
+    def count(self, kind):
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+
+    def stats(self):
+        return (f"полных попаданий {self.hits}, только характеристики {self.partial_hits}, "
+                f"промахов {self.misses}, записей {self._size}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
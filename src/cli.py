@@ -0,0 +1,195 @@
+"""Консольный запуск парсера без графического интерфейса (PyQt6 не нужен).
+
+Примеры:
+    python -m src.cli "https://kaspi.kz/shop/c/tv_audio/" -o tv.xlsx
+    python -m src.cli -i catalogs.txt -o all.jsonl --workers 4 --lean
+    python -m src.cli -i catalogs.txt -o all.csv --jobs 3 --rps 2
+    python -m src.cli "https://kaspi.kz/shop/c/smartphones/" -o prices.csv --fields card,sellers
+    python -m src.cli "https://kaspi.kz/shop/c/smartphones/" -o phones.parquet \
+        --price-report prices.csv --shop "Мой магазин"
+
+В файле со списком каталогов после URL можно указать приоритет через пробел:
+каталоги с большим приоритетом запускаются раньше.
+
+Тяжёлые модули (Selenium, парсеры, openpyxl) импортируются только после разбора
+аргументов, поэтому --help и ошибки в аргументах отрабатывают мгновенно.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+FORMAT_CHOICES = ('xlsx', 'csv', 'json', 'jsonl', 'parquet')
+FIELD_CHOICES = ('card', 'specs', 'characteristics', 'sellers')
+# Категории BLOCK_LISTS из src/browser_pool.py (сам модуль тянет Selenium)
+BLOCK_CHOICES = ('images', 'media', 'fonts', 'stylesheets', 'trackers')
+
+
+def log(message, **context):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+
+def read_urls(args):
+    """Список (url, priority): из аргументов с приоритетом 0 и из файла строками «url [priority]»."""
+    urls = [(url, 0) for url in args.urls]
+    if args.input:
+        with (sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')) as f:
+            for line in f:
+                parts = line.split()
+                if not parts or parts[0].startswith('#'):
+                    continue
+                try:
+                    priority = int(parts[1]) if len(parts) > 1 else 0
+                except ValueError:
+                    raise argparse.ArgumentTypeError(f"некорректный приоритет в строке: {line.strip()}")
+                urls.append((parts[0], priority))
+    return urls
+
+
+def field_groups(value):
+    """'card,sellers' -> ('card', 'sellers') с проверкой названий групп."""
+    groups = tuple(group.strip() for group in value.split(',') if group.strip())
+    unknown = [group for group in groups if group not in FIELD_CHOICES]
+    if unknown or not groups:
+        raise argparse.ArgumentTypeError(f"группы полей через запятую из: {', '.join(FIELD_CHOICES)}")
+    return groups
+
+
+def block_categories(value):
+    """'images,trackers' -> ('images', 'trackers') с проверкой названий категорий."""
+    categories = tuple(category.strip() for category in value.split(',') if category.strip())
+    unknown = [category for category in categories if category not in BLOCK_CHOICES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"категории через запятую из: {', '.join(BLOCK_CHOICES)}")
+    return categories
+
+
+def add_block_arguments(parser):
+    parser.add_argument('--lean', action='store_true', help="экономный браузер без картинок, шрифтов и стилей")
+    parser.add_argument('--block', type=block_categories,
+                        help="что блокировать в экономном режиме, через запятую: "
+                             f"{', '.join(BLOCK_CHOICES)} (по умолчанию всё); включает --lean")
+    parser.add_argument('--block-extra', action='append', default=[], metavar='PATTERN',
+                        help="дополнительный шаблон URL для блокировки, например '*.gif' или '*ads.example*'; "
+                             "можно повторять; включает --lean")
+
+
+def block_options(args):
+    """Параметры блокировки для ScrapeEngine/JobScheduler из аргументов add_block_arguments."""
+    return {'lean': args.lean or args.block is not None or bool(args.block_extra),
+            'block': args.block, 'block_extra': tuple(args.block_extra)}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Парсер каталогов kaspi.kz без графического интерфейса")
+    parser.add_argument('urls', nargs='*', help="URL каталогов")
+    parser.add_argument('-i', '--input',
+                        help="файл со строками «URL [приоритет]», по одной на каталог ('-' — stdin)")
+    parser.add_argument('-o', '--output', required=True, help="итоговый файл; все каталоги пишутся в него")
+    parser.add_argument('-f', '--format', choices=FORMAT_CHOICES,
+                        help="формат вывода; по умолчанию по расширению файла")
+    parser.add_argument('--fields', type=field_groups,
+                        help="группы полей через запятую: card, specs, characteristics, sellers (по умолчанию все); "
+                             "например card,sellers для мониторинга цен")
+    parser.add_argument('--jobs', type=int, default=1, help="сколько каталогов парсить одновременно")
+    parser.add_argument('--rps', type=float, default=0, help="общий лимит запросов к сайту в секунду (0 — без лимита)")
+    parser.add_argument('--burst', type=int, help="сколько запросов можно сделать подряд после простоя (по умолчанию = --rps)")
+    parser.add_argument('--workers', type=int, default=3, help="общих сессий браузера для карточек товаров")
+    parser.add_argument('--queue-size', type=int, default=50)
+    parser.add_argument('--parse-processes', type=int,
+                        help="процессов для разбора HTML (по умолчанию по числу ядер, с --http 0; 0 — в потоках)")
+    parser.add_argument('--recycle-pages', type=int, default=300,
+                        help="перезапускать сессию браузера после стольких страниц (0 — никогда)")
+    parser.add_argument('--recycle-memory-mb', type=int, default=1500,
+                        help="перезапускать сессию, если Chrome занял больше, МБ (нужен psutil; 0 — выкл.)")
+    parser.add_argument('--listing-workers', type=int,
+                        help="страниц каталога, загружаемых одновременно (по умолчанию = --workers)")
+    parser.add_argument('--click-pages', action='store_true',
+                        help="листать каталог кликами по «Следующая» вместо прямых ссылок ?page=N")
+    parser.add_argument('--http', action='store_true', help="быстрый HTTP-режим для карточек товаров")
+    parser.add_argument('--http-concurrency', type=int, default=8)
+    parser.add_argument('--retries', type=int, default=2,
+                        help="повторов в конце обхода для товаров, которые не загрузились")
+    parser.add_argument('--resume', action='store_true', help="продолжить прерванный запуск")
+    parser.add_argument('--cache-specs-hours', type=float, default=0, help="кэш характеристик, ч (0 — выкл.)")
+    parser.add_argument('--cache-sellers-minutes', type=float, default=0, help="кэш продавцов и цен, мин")
+    parser.add_argument('--delta', action='store_true', help="режим дельты по цене и рейтингу в карточке")
+    parser.add_argument('--metrics', help="куда сохранить метрики запуска: .prom — Prometheus textfile, иначе JSON")
+    add_block_arguments(parser)
+    parser.add_argument('--price-report', help="после парсинга сохранить ценовую сводку по продавцам (src.offers)")
+    parser.add_argument('--shop', help="свой магазин для места в ценовой сводке")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        urls = read_urls(args)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if not urls:
+        parser.error("не указан ни один URL каталога")
+    bad = [url for url, _ in urls if not url.startswith('http')]
+    if bad:
+        parser.error(f"некорректный URL: {bad[0]}")
+    format_type = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if format_type not in FORMAT_CHOICES:
+        parser.error("не удалось определить формат по расширению, укажите --format")
+
+    from src.scheduler import JobScheduler
+    from src.writers import SynchronizedWriter, open_writer
+
+    scheduler = JobScheduler(
+        max_concurrent=args.jobs,
+        rate=args.rps or None,
+        burst=args.burst,
+        log=log,
+        metrics_path=args.metrics,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        parse_processes=args.parse_processes,
+        recycle_pages=args.recycle_pages,
+        recycle_memory_mb=args.recycle_memory_mb,
+        direct_pages=not args.click_pages,
+        listing_workers=args.listing_workers,
+        http_engine=args.http,
+        http_concurrency=args.http_concurrency,
+        fields=args.fields,
+        retries=args.retries,
+        resume=args.resume,
+        cache_specs_ttl=args.cache_specs_hours * 3600,
+        cache_sellers_ttl=args.cache_sellers_minutes * 60,
+        delta=args.delta,
+        **block_options(args),
+    )
+    stopping = False
+
+    def on_sigint(signum, frame):
+        nonlocal stopping
+        if stopping:
+            raise KeyboardInterrupt
+        stopping = True
+        log("Остановка после текущей страницы; повторное Ctrl+C прервёт немедленно")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, on_sigint)
+
+    with SynchronizedWriter(open_writer(args.output, format_type)) as writer:
+        for url, priority in urls:
+            scheduler.submit(url, priority, writer=writer)
+        total = scheduler.run()
+    log(f"Собрано товаров: {total}. Файл сохранен: {args.output}")
+    if total and args.price_report:
+        from src.offers import price_report
+        count = price_report(args.output, args.price_report, args.shop)
+        log(f"Ценовая сводка по {count} товарам: {args.price_report}")
+    return 0 if total else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
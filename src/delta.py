@@ -0,0 +1,64 @@
+import json
+import sqlite3
+import threading
+import time
+
+from src.paths import app_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    link TEXT PRIMARY KEY,
+    price TEXT,
+    rating TEXT,
+    details TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SnapshotStore:
+    """Снимок карточек с прошлого запуска для режима дельты.
+
+    Если цена и рейтинг в карточке каталога не изменились, страницу товара не
+    открываем и переносим данные из прошлого запуска.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or app_path('snapshots.sqlite3')
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.new = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def previous_details(self, card):
+        """Данные товара из прошлого запуска, если карточка не изменилась, иначе None."""
+        with self._lock:
+            row = self._conn.execute("SELECT price, rating, details FROM snapshots WHERE link = ?",
+                                     (card['Ссылка'],)).fetchone()
+        if not row:
+            self.new += 1
+            return None
+        price, rating, details = row
+        if price != card['Цена'] or rating != card['Рейтинг']:
+            self.changed += 1
+            return None
+        self.unchanged += 1
+        return json.loads(details)
+
+    def put(self, card, details):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (link, price, rating, details, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (card['Ссылка'], card['Цена'], card['Рейтинг'], json.dumps(details, ensure_ascii=False), time.time()))
+            self._conn.commit()
+
+    def stats(self):
+        return f"новых {self.new}, изменилось {self.changed}, без изменений {self.unchanged}"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,583 @@
+from contextlib import ExitStack
+from functools import partial
+from urllib.parse import urljoin
+
+from selenium.webdriver.common.by import By
+
+from src.browser_pool import (BrowserPool, TrafficStats, blocked_patterns, create_driver, launch_driver,
+                              quit_driver)
+from src.cache import DetailCache
+from src.delta import SnapshotStore
+from src.extract import (FIELD_GROUPS, INCOMPLETE_FIELD, PRODUCT_GROUPS, build_details, extract_cards,
+                         extract_pagination, extract_product, is_disabled, select_groups)
+from src.journal import RunJournal
+from src.listing import ListingLoader
+from src.metrics import RunMetrics, stage
+from src.parse_pool import ParsePool, default_processes
+from src.pipeline import DetailPipeline
+from src.retry import CircuitBreaker
+from src.runlog import print_log
+from src.waits import (CHARACTERISTICS_READY, LISTING_READY, PRODUCT_READY, SELLERS_READY,
+                       AdaptiveWaiter, first_card_href, listing_changed)
+from src.writers import open_writer
+
+CHARACTERISTICS_TAB = '//li[contains(@class, "tabs-content__tab") and contains(text(), "Характеристики")]'
+NEXT_PAGE = '//li[contains(@class, "pagination__el") and contains(text(), "Следующая")]'
+
+
+def load_product_page(driver, link, log, waiter, characteristics=True, traffic=None, metrics=None, sellers=True):
+    """Страница товара в браузере. Без characteristics вкладка «Характеристики» не открывается,
+    без sellers не ждём таблицу продавцов.
+
+    Товар открывается в той же вкладке сессии, без открытия и закрытия новых окон.
+    Возвращает page_source или None при ошибке; разбор HTML — забота вызывающего.
+    """
+    try:
+        with stage(metrics, 'product_load'):
+            waiter.get(driver, link)
+        with stage(metrics, 'product_wait'):
+            waiter.until(driver, PRODUCT_READY, 'product')
+            if sellers:
+                waiter.until(driver, SELLERS_READY, 'sellers', required=False)
+        if traffic:
+            traffic.record(driver)
+
+        try:
+            next_button = driver.find_elements(By.XPATH, CHARACTERISTICS_TAB) if characteristics else []
+            if next_button:
+                with stage(metrics, 'characteristics_tab'):
+                    driver.execute_script("arguments[0].click();", next_button[0])
+                    waiter.until(driver, CHARACTERISTICS_READY, 'characteristics', required=False)
+        except Exception:
+            pass
+
+        return driver.page_source
+
+    except Exception as e:
+        log(f"Ошибка парсинга товара: {e}", url=link)
+        return None
+
+
+def fetch_product_details_http(fetcher, link, log, metrics=None, parser=None, groups=None):
+    """Быстрый путь без браузера. None означает, что товар нужно открыть в Selenium."""
+    try:
+        with stage(metrics, 'http_fetch'):
+            html = fetcher.fetch(link)
+    except Exception as e:
+        log(f"HTTP-ошибка, откроем в браузере: {e}", url=link)
+        return None
+    if not html:
+        return None
+    with stage(metrics, 'product_parse'):
+        page = parser.product(html, groups) if parser else extract_product(html, groups=groups)
+    return page if page['complete'] else None
+
+
+class ScrapeEngine:
+    """Парсинг одного каталога без привязки к интерфейсу.
+
+    Сообщения передаются в log(message, **context), где context — page и url, если
+    сообщение относится к странице каталога или товару (см. src/runlog.py).
+    Строки пишутся в writer, если он передан (тогда его закрывает вызывающий код),
+    иначе в output_path в формате format_type.
+
+    pool, fetcher, cache и limiter можно передать готовыми, чтобы несколько каталогов
+    работали на общих браузерах, HTTP-клиенте, кэше и ограничении частоты запросов
+    (см. src/scheduler.py); так же driver — сессия для страниц каталога. Переданные
+    объекты движок не закрывает.
+
+    При direct_pages число страниц берётся из пагинации первой страницы, и остальные
+    загружаются по прямым ссылкам ?page=N в listing_workers потоков (по умолчанию по
+    числу сессий пула). Если прямая ссылка не сработала, обход продолжается кликами
+    по «Следующая».
+
+    При lean браузер работает в экономном режиме и отбрасывает запросы по шаблонам
+    категорий block из BLOCK_LISTS (None — все категории) и своим шаблонам block_extra.
+
+    Сессии пула перезапускаются после recycle_pages страниц или когда Chrome занял
+    больше recycle_memory_mb МБ (0 или None — без ограничения).
+
+    HTML разбирается в parse_processes процессах (src/parse_pool.py, None — по числу
+    ядер, а в HTTP-режиме 0 — в потоках); готовый parser можно передать, как и pool.
+
+    Время этапов и скорость сбора копятся в metrics (src/metrics.py); progress() можно
+    опрашивать из другого потока, а в конце запуска метрики сохраняются в metrics_path
+    (.prom — Prometheus textfile, иначе JSON).
+
+    page_range=(первая, последняя) ограничивает обход частью страниц каталога для
+    шардов (src/shards.py); последняя None — до конца каталога.
+
+    Товары, которые не загрузились, повторяются в конце обхода до retries раз (см.
+    DetailPipeline); оставшиеся без данных строки помечаются колонкой INCOMPLETE_FIELD.
+
+    fields — группы полей из FIELD_GROUPS (по умолчанию все). Для незапрошенных групп
+    не открывается вкладка, не ждутся блоки и не разбирается разметка; без групп
+    страницы товара (только 'card') страницы товаров не открываются вовсе.
+    """
+
+    def __init__(self, url, format_type=None, output_path=None, workers=3, queue_size=50, http_engine=False,
+                 http_concurrency=8, resume=False, cache_specs_ttl=0, cache_sellers_ttl=0,
+                 delta=False, lean=False, log=None, writer=None, pool=None, fetcher=None, cache=None,
+                 limiter=None, driver=None, driver_path=None, direct_pages=True, listing_workers=None,
+                 recycle_pages=300, recycle_memory_mb=1500, metrics=None, metrics_path=None,
+                 parse_processes=None, parser=None, page_range=None, retries=2, fields=None,
+                 block=None, block_extra=()):
+        self.url = url
+        self.format_type = format_type
+        self.output_path = output_path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.http_engine = http_engine
+        self.http_concurrency = http_concurrency
+        self.resume = resume
+        self.cache_specs_ttl = cache_specs_ttl
+        self.cache_sellers_ttl = cache_sellers_ttl
+        self.delta = delta
+        self.lean = lean
+        self.block = block
+        self.block_extra = block_extra
+        self.log = log or print_log
+        self.writer = writer
+        self.pool = pool
+        self.fetcher = fetcher
+        self.cache = cache
+        self.limiter = limiter
+        self.driver = driver
+        self.driver_path = driver_path
+        self.direct_pages = direct_pages
+        self.listing_workers = listing_workers
+        self.recycle_pages = recycle_pages
+        self.recycle_memory_mb = recycle_memory_mb
+        self.parse_processes = default_processes(http_engine) if parse_processes is None else parse_processes
+        self.own_parser = parser is None
+        self.parser = parser or ParsePool(0)
+        self.page_range = page_range
+        self.retries = retries
+        self.fields = frozenset(fields or FIELD_GROUPS)
+        self.product_groups = self.fields & PRODUCT_GROUPS
+        # В кэш пишем только полные группы: характеристики — вместе с краткими
+        self.cache_specs = {'specs', 'characteristics'} <= self.fields
+        self.cache_sellers = 'sellers' in self.fields
+        self.metrics = metrics or RunMetrics()
+        self.metrics_path = metrics_path
+        self.expected = 0
+        self.traffic = TrafficStats()
+        self.waiter = AdaptiveWaiter(limiter=limiter)
+        self.rows = 0
+        self.stop_parsing = False
+
+    def stop(self):
+        self.stop_parsing = True
+        self.log("Получен сигнал остановки парсинга...")
+
+    def progress(self):
+        """(собрано, ожидается всего, товаров в минуту, секунд до конца или None)."""
+        done, expected = self.rows, max(self.expected, self.rows)
+        return done, expected, self.metrics.rate_per_minute(), self.metrics.eta(done, expected)
+
+    def _estimate(self, pages, per_page):
+        # Оценка объёма каталога для прогресса: страниц × карточек на первой странице
+        if self.page_range:
+            first, last = self.page_range
+            pages = max(0, (min(pages, last) if last else pages) - first + 1)
+        self.expected = max(self.expected, pages * per_page)
+
+    def _cache_put(self, link, page, specs=True):
+        specs = specs and self.cache_specs
+        if specs or self.cache_sellers:
+            self.cache.put(link, page, specs=specs, sellers=self.cache_sellers)
+
+    def fast_details(self, link):
+        """Товар без браузера: из кэша или HTTP. None — нужен браузер."""
+        cached = self.cache.get(link) if self.cache else None
+        if (cached and (cached['specs_fresh'] or not self.product_groups - {'sellers'})
+                and (cached['sellers_fresh'] or not self.cache_sellers)):
+            self.cache.count('hits')
+            return build_details(select_groups(cached, self.fields))
+        if self.fetcher:
+            page = fetch_product_details_http(self.fetcher, link, self.log, self.metrics, self.parser,
+                                              self.product_groups)
+            if page:
+                if self.cache:
+                    self.cache.count('misses')
+                    self._cache_put(link, page)
+                return build_details(page)
+        return None
+
+    def browser_details(self, driver, link):
+        """Загружает товар в сессии браузера. Возвращает функцию, которая дождётся разбора
+        HTML: конвейер вызывает её уже после возврата сессии в пул."""
+        cached = self.cache.get(link) if self.cache else None
+        specs_fresh = bool(cached and cached['specs_fresh'])
+        groups = self.product_groups - {'specs', 'characteristics'} if specs_fresh else self.product_groups
+        html = load_product_page(driver, link, self.log, self.waiter,
+                                 characteristics='characteristics' in groups, traffic=self.traffic,
+                                 metrics=self.metrics, sellers='sellers' in groups)
+        if html is None:
+            return {}
+        pending = self.parser.submit_product(html, groups)
+        return lambda: self._finish_browser_details(link, cached, specs_fresh, pending)
+
+    def _finish_browser_details(self, link, cached, specs_fresh, pending):
+        with self.metrics.time('product_parse'):
+            page = pending()
+        if self.cache:
+            if specs_fresh:
+                # Характеристики из кэша, со страницы берём только продавцов
+                self.cache.count('partial_hits')
+                page = select_groups({**page, 'specifications': cached['specifications'],
+                                      'characteristics': cached['characteristics']}, self.fields)
+                self._cache_put(link, page, specs=False)
+            else:
+                self.cache.count('misses')
+                self._cache_put(link, page)
+        return build_details(page)
+
+    def _export_metrics(self, pipeline):
+        # Счётчики, а не gauge: у общих метрик планировщика их суммируют все каталоги
+        self.metrics.count('pipeline_producer_wait_seconds', round(pipeline.producer_wait, 3))
+        self.metrics.count('pipeline_consumer_wait_seconds', round(pipeline.consumer_wait, 3))
+        self.metrics.count('page_bytes', self.traffic.bytes)
+        self.metrics.count('product_retries', pipeline.retried)
+        self.metrics.count('products_recovered', pipeline.recovered)
+        self.metrics.count('circuit_breaker_pauses', pipeline.breaker.opened if pipeline.breaker else 0)
+        if self.limiter:
+            self.metrics.gauge('rate_limit_wait_seconds', round(self.limiter.waited, 3))
+        if not self.metrics_path:
+            return
+        try:
+            self.metrics.export(self.metrics_path)
+            self.log(f"Метрики сохранены: {self.metrics_path}")
+        except OSError as e:
+            self.log(f"Не удалось сохранить метрики: {e}")
+
+    def _quietly(self, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            self.log(f"Ошибка при закрытии: {e}")
+
+    def run(self):
+        """Запускает парсинг и возвращает число сохранённых строк."""
+        # Всё, что запуск открыл (браузеры, файл, журнал, процессы разбора), закрывается
+        # и при исключении посреди обхода
+        with ExitStack() as cleanup:
+            return self._run(cleanup)
+
+    def _run(self, cleanup):
+        blocked = blocked_patterns(self.block, self.block_extra) if self.lean else None
+        if blocked:
+            self.log(f"Экономный режим браузера: блокируется шаблонов URL {len(blocked)}")
+        if self.driver:
+            driver, driver_path = self.driver, self.driver_path
+        else:
+            if self.driver_path:
+                driver_path = self.driver_path
+                driver = create_driver(driver_path, blocked)
+            else:
+                driver, driver_path = launch_driver(blocked, self.log)
+            cleanup.callback(quit_driver, driver)
+        own_pool = self.pool is None
+        pool = self.pool or BrowserPool(partial(create_driver, driver_path, blocked), size=self.workers,
+                                        log=self.log, max_pages=self.recycle_pages,
+                                        max_memory_mb=self.recycle_memory_mb)
+
+        try:
+            self.waiter.get(driver, self.url)
+            self.waiter.until(driver, LISTING_READY, 'listing')
+        except Exception as e:
+            self.log(f"Ошибка загрузки: {e}")
+            return 0
+
+        try:
+            if own_pool:
+                cleanup.callback(self._quietly, pool.close)
+                pool.start()
+        except Exception as e:
+            self.log(f"Ошибка запуска браузеров: {e}")
+            return 0
+
+        first_html = driver.page_source
+        visible_pages, first_has_next = extract_pagination(first_html)
+        first_cards = extract_cards(first_html)[0]
+        per_page = len(first_cards)
+        self._estimate(max(visible_pages or 1, 2 if first_has_next else 1), per_page)
+        total_pages = visible_pages if self.direct_pages else None
+        direct = bool(total_pages and total_pages > 1)
+        if direct:
+            self.log(f"Страниц в каталоге: {total_pages}, загружаем их по прямым ссылкам")
+
+        own_writer = self.writer is None
+        writer = open_writer(self.output_path, self.format_type) if own_writer else self.writer
+        if own_writer:
+            cleanup.callback(self._quietly, writer.close)
+        journal = RunJournal()
+        cleanup.callback(self._quietly, journal.close)
+        run_id = journal.find_unfinished(self.url) if self.resume else None
+        done_links = set()
+        page_num = 1
+        if run_id:
+            done_links = journal.done_links(run_id)
+            for row in journal.rows(run_id):
+                writer.write(row)
+                self.rows += 1
+            point = journal.resume_point(run_id)
+            if point and point[0] > 1 and point[1] != self.url:
+                page_num = point[0]
+                self.log(f"Продолжение со страницы {page_num}")
+                if not direct:
+                    try:
+                        self.waiter.get(driver, point[1])
+                    except Exception as e:
+                        self.log(f"Не удалось открыть страницу {page_num}, начинаем с первой: {e}")
+                        self.waiter.get(driver, self.url)
+                        page_num = 1
+            self.log(f"Продолжение прерванного запуска: уже собрано товаров {len(done_links)}")
+        else:
+            if self.resume:
+                self.log("Прерванный запуск для этого URL не найден, начинаем заново")
+            run_id = journal.start_run(self.url)
+
+        def fail_run(exc_type, exc, tb):
+            if exc_type is not None:
+                self._quietly(journal.finish_run, run_id, 'failed')
+
+        cleanup.push(fail_run)
+        first_page, end_page = self.page_range or (1, None)
+        if first_page > 1:
+            self.log(f"Диапазон страниц: {first_page}–{end_page or 'конец'}")
+        card_pages = {}
+        seen = set()
+        if first_page > 1:
+            # Товары первой страницы собирает её шард; заодно страница, для которой сайт
+            # отдал первую вместо ?page=N, не примется за свою
+            seen.update(urljoin(self.url, card['Ссылка']) for card in first_cards)
+
+        own_fetcher = self.fetcher is None and self.http_engine
+        if own_fetcher:
+            from src.http_fetch import HttpFetcher
+            self.fetcher = HttpFetcher(concurrency=self.http_concurrency, limiter=self.limiter).start()
+            cleanup.callback(self._quietly, self.fetcher.close)
+        if self.fetcher:
+            self.log("Включён быстрый HTTP-режим для карточек товаров")
+        own_cache = self.cache is None and self.cache_specs_ttl > 0
+        if own_cache:
+            self.cache = DetailCache(specs_ttl=self.cache_specs_ttl, sellers_ttl=self.cache_sellers_ttl)
+            cleanup.callback(self._quietly, self.cache.close)
+        # Снимки для дельты годятся только с полным набором полей
+        snapshots = SnapshotStore() if self.delta and self.fields == set(FIELD_GROUPS) else None
+        if snapshots:
+            cleanup.callback(self._quietly, snapshots.close)
+        if self.delta and not snapshots:
+            self.log("Режим дельты работает только со всеми группами полей и отключён")
+        if self.own_parser and self.parse_processes:
+            self.parser = ParsePool(self.parse_processes)
+            cleanup.callback(self._quietly, self.parser.close)
+            self.log(f"Разбор HTML в отдельных процессах: {self.parse_processes}")
+
+        def on_result(card, details):
+            shown = card if 'card' in self.fields else {'Название': card['Название'], 'Ссылка': card['Ссылка']}
+            loaded = bool(details) or not self.product_groups
+            row = {**shown, **details} if loaded else {**shown, INCOMPLETE_FIELD: 'да'}
+            with self.metrics.time('write'):
+                writer.write(row)
+            self.rows += 1
+            self.metrics.count('products')
+            page = card_pages.pop(card['Ссылка'], page_num)
+            if loaded:
+                journal.add_item(run_id, card['Ссылка'], page, row)
+                if snapshots and details:
+                    snapshots.put(card, details)
+                self.log(f"Собран товар: {card['Название']}", page=page, url=card['Ссылка'])
+            else:
+                self.metrics.count('products_without_details')
+                self.log(f"Товар без данных, строка помечена как неполная: {card['Название']}",
+                         page=page, url=card['Ссылка'])
+
+        pipeline = DetailPipeline(
+            pool,
+            self.browser_details,
+            on_result,
+            queue_size=self.queue_size,
+            should_stop=lambda: self.stop_parsing,
+            fast_task=self.fast_details if self.fetcher or self.cache else None,
+            # Пока воркер ждёт разбор в процессе, освобождённую им сессию берёт другой воркер
+            workers=(max(self.workers, self.http_concurrency) if self.fetcher else pool.size)
+            + self.parser.processes,
+            retries=self.retries,
+            breaker=CircuitBreaker(log=self.log),
+        ).start()
+
+        def stop_pipeline(exc_type, exc, tb):
+            # Воркеры должны вернуть сессии в пул до его закрытия
+            if exc_type is not None:
+                self.stop_parsing = True
+                self._quietly(pipeline.finish)
+
+        cleanup.push(stop_pipeline)
+
+        def enqueue(number, url, html):
+            """Ставит карточки страницы в конвейер.
+
+            Возвращает число новых товаров на странице или None, если карточек на ней нет.
+            Товары, уже встреченные на других страницах (каталог сдвинулся во время обхода),
+            повторно не собираются.
+            """
+            with self.metrics.time('listing_parse'):
+                cards, skipped = self.parser.cards(html)
+            self.metrics.count('pages')
+            if skipped:
+                self.log(f"Пропущено карточек без названия, ссылки или цены: {skipped}")
+            if not cards and not skipped:
+                return None
+
+            fresh = []
+            for card in cards:
+                card['Ссылка'] = urljoin(self.url, card['Ссылка'])
+                if card['Ссылка'] not in seen:
+                    seen.add(card['Ссылка'])
+                    fresh.append(card)
+            if len(fresh) < len(cards):
+                self.log(f"Страница {number}: пропущено повторов с других страниц {len(cards) - len(fresh)}",
+                         page=number)
+
+            journal.add_page(run_id, number, url, len(fresh))
+            for card in fresh:
+                if self.stop_parsing:
+                    break
+                if card['Ссылка'] in done_links:
+                    continue
+                card_pages[card['Ссылка']] = number
+                if not self.product_groups:
+                    pipeline.put(card, {})  # только карточка: страница товара не нужна
+                else:
+                    pipeline.put(card, snapshots.previous_details(card) if snapshots else None)
+
+            self.log(f"Страница {number} в очереди: {pipeline.stats()}", page=number, url=url)
+            return len(fresh)
+
+        completed = False
+        skip_current = False
+        if direct:
+            # Пагинация показывает лишь окно номеров, поэтому last_page растёт по ходу обхода;
+            # продолжение или шард могут начинаться и за этим окном
+            start_page = max(page_num, first_page)
+            last_page = max(total_pages, start_page)
+            last_done = None
+            loader = ListingLoader(pool, self.waiter, fetcher=self.fetcher,
+                                   workers=self.listing_workers or pool.size,
+                                   should_stop=lambda: self.stop_parsing, metrics=self.metrics)
+            failed = False
+            pages = loader.pages(self.url, start_page,
+                                 lambda: min(last_page, end_page) if end_page else last_page,
+                                 prefetched={1: first_html})
+            for page_num, url, html in pages:
+                fresh = enqueue(page_num, url, html) if html else None
+                if not fresh and page_num > 1:
+                    self.log(f"Страница {page_num} по прямой ссылке не загрузилась, переходим на перелистывание",
+                             page=page_num, url=url)
+                    failed = True
+                    break
+                last_done = (page_num, url)
+                visible, has_next = extract_pagination(html)
+                last_page = max(last_page, visible or 0, page_num + 1 if has_next else 0)
+                self._estimate(last_page, per_page)
+                if self.stop_parsing:
+                    self.log("Остановка парсинга после текущей страницы...")
+                    break
+
+            if not failed:
+                completed = not self.stop_parsing
+                if completed:
+                    self.log("Достигнута последняя страница.")
+            elif last_done:
+                # Перелистывание продолжается со страницы, собранной последней
+                page_num, url = last_done
+                skip_current = True
+                if page_num > 1:
+                    try:
+                        self.waiter.get(driver, url)
+                    except Exception as e:
+                        self.log(f"Не удалось открыть страницу {page_num}, начинаем с первой: {e}")
+                        self.waiter.get(driver, self.url)
+                        page_num, skip_current = 1, False
+            else:
+                page_num = 1
+
+        while not completed and not self.stop_parsing:
+            try:
+                self.waiter.until(driver, LISTING_READY, 'listing')
+
+                html = driver.page_source
+                if skip_current:
+                    skip_current = False
+                elif page_num < first_page:
+                    pass  # страницы до начала диапазона только перелистываем
+                elif enqueue(page_num, driver.current_url, html) is None:
+                    self.log("Товары не найдены на текущей странице")
+                    break
+                visible, has_next = extract_pagination(html)
+                self._estimate(max(visible or 0, page_num + 1 if has_next else page_num), per_page)
+                if end_page and page_num >= end_page:
+                    self.log("Достигнута последняя страница диапазона.")
+                    completed = True
+                    break
+
+                if self.stop_parsing:
+                    self.log("Остановка парсинга после текущей страницы...")
+                    break
+
+                try:
+                    next_button = driver.find_elements(By.XPATH, NEXT_PAGE)
+                    if next_button and not is_disabled(next_button[0].get_attribute('class')):
+                        old_href = first_card_href(driver)
+                        if self.limiter:
+                            self.limiter.acquire()
+                        with self.metrics.time('pagination_click'):
+                            driver.execute_script("arguments[0].click();", next_button[0])
+                            page_num += 1
+                            self.log(f"Переход на страницу {page_num}", page=page_num)
+                            self.waiter.until(driver, listing_changed(old_href), 'pagination')
+                    else:
+                        self.log("Достигнута последняя страница.")
+                        completed = True
+                        break
+                except Exception:
+                    break
+
+            except Exception as e:
+                self.log(f"Ошибка на странице {page_num}: {e}", page=page_num)
+                break
+
+        pipeline.finish()
+        self.log(f"Конвейер: {pipeline.stats()}. Узкое место: {pipeline.bottleneck()}")
+
+        if own_writer:
+            try:
+                self.log("Сохранение файла...")
+                writer.close()
+                if writer.rows:
+                    self.log(f"Собрано товаров: {writer.rows}")
+                    self.log("Парсинг завершён. Данные сохранены.")
+                    self.log(f"Файл сохранен: {self.output_path}")
+                else:
+                    self.log("Нет данных для сохранения.")
+            except Exception as e:
+                self.log(f"Ошибка сохранения: {e}")
+
+        journal.finish_run(run_id, 'done' if completed and not self.stop_parsing else 'stopped')
+        self.log(f"Трафик страниц товаров: {self.traffic.summary()}")
+        if own_pool and pool.recycled:
+            self.log(f"Сессий браузера перезапущено по лимиту страниц или памяти: {pool.recycled}")
+        self.log(f"Ожидания: {self.waiter.summary()}")
+        self.log(f"Этапы: {self.metrics.summary()}")
+        self.log(f"Скорость: {self.metrics.rate_per_minute():.1f} товаров/мин")
+        self._export_metrics(pipeline)
+        if self.cache:
+            self.log(f"Кэш товаров: {self.cache.stats()}")
+        if snapshots:
+            self.log(f"Режим дельты: {snapshots.stats()}")
+
+        if self.stop_parsing:
+            self.log("Парсинг остановлен пользователем.")
+        return self.rows
@@ -0,0 +1,271 @@
+import re
+
+SELECTORS = {
+    'short_specs': 'ul.short-specifications li.short-specifications__text',
+    'characteristics': 'dl.specifications-list__el dl.specifications-list__spec',
+    'spec_term': 'span.specifications-list__spec-term-text',
+    'spec_value': 'dd.specifications-list__spec-definition',
+    'sellers_table': 'table.sellers-table__self',
+    'seller_rows': 'tr',
+    'seller_link': 'a[href]',
+    'seller_price': 'div.sellers-table__price-cell-text',
+    'cards': '.item-card__info',
+    'card_name': '.item-card__name',
+    'card_link': 'a.item-card__name-link',
+    'card_price': 'span.item-card__prices-price',
+    'card_stars': '.item-card__rating .rating',
+    'card_reviews': '.item-card__rating a',
+    'pagination': 'li.pagination__el',
+}
+
+MAX_SELLERS = 6
+CARD_FIELDS = ('Название', 'Ссылка', 'Цена', 'Рейтинг', 'Отзывы')
+# Полный список продавцов [(имя, цена), ...] в строке результата; колонками Seller_i/Price_i
+# выводятся только первые MAX_SELLERS, весь список пишет только типизированный вывод
+OFFERS_FIELD = '_offers'
+# Отметка строки, для которой страницу товара так и не удалось загрузить
+INCOMPLETE_FIELD = 'Неполные данные'
+# Группы полей: карточка каталога, краткие характеристики, вкладка «Характеристики», продавцы
+FIELD_GROUPS = ('card', 'specs', 'characteristics', 'sellers')
+PRODUCT_GROUPS = frozenset(FIELD_GROUPS) - {'card'}
+BACKEND_PRIORITY = ('selectolax', 'lxml', 'html.parser')
+
+_WHITESPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+# Оценка в классе звёзд карточки: 'rating _small _90' — 4.5 из 5
+_STARS = re.compile(r'^_(\d+)$')
+
+
+class SoupBackend:
+    """BeautifulSoup с заранее скомпилированными селекторами soupsieve."""
+
+    def __init__(self, parser='html.parser'):
+        import soupsieve
+        from bs4 import BeautifulSoup
+        if parser == 'lxml':
+            import lxml  # noqa: F401  -- проверяем наличие до первого парсинга
+        self.name = parser
+        self._soup = BeautifulSoup
+        self._compiled = {key: soupsieve.compile(css) for key, css in SELECTORS.items()}
+
+    def parse(self, html):
+        return self._soup(html, self.name)
+
+    def select(self, node, key):
+        return self._compiled[key].select(node)
+
+    def select_one(self, node, key):
+        return self._compiled[key].select_one(node)
+
+    def text(self, node):
+        return node.get_text()
+
+    def attr(self, node, name):
+        # class и другие многозначные атрибуты BeautifulSoup отдаёт списком
+        value = node.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+
+class SelectolaxBackend:
+    """Lexbor через selectolax: самый быстрый из поддерживаемых парсеров."""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, html):
+        return self._parser(html)
+
+    def select(self, node, key):
+        return node.css(SELECTORS[key])
+
+    def select_one(self, node, key):
+        return node.css_first(SELECTORS[key])
+
+    def text(self, node):
+        return node.text()
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+
+_backends = {}
+
+
+def available_backends():
+    names = []
+    for name in BACKEND_PRIORITY:
+        try:
+            get_backend(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def get_backend(name=None):
+    """Возвращает парсер по имени; без имени — самый быстрый из установленных."""
+    if name is None:
+        for candidate in BACKEND_PRIORITY:
+            try:
+                return get_backend(candidate)
+            except ImportError:
+                continue
+        raise ImportError("Не найден ни один HTML-парсер")
+    if name not in _backends:
+        if name == 'selectolax':
+            _backends[name] = SelectolaxBackend()
+        elif name in ('lxml', 'html.parser'):
+            _backends[name] = SoupBackend(name)
+        else:
+            raise ValueError(f"Неизвестный HTML-парсер: {name}")
+    return _backends[name]
+
+
+def _text(backend, node):
+    return backend.text(node).strip() if node is not None else None
+
+
+def is_disabled(classes):
+    """Отключена ли кнопка пагинации: по классу disabled или _disabled, а не подстроке."""
+    return not {'disabled', '_disabled'}.isdisjoint((classes or '').split())
+
+
+def extract_product(html, backend=None, groups=None):
+    """Разбирает страницу товара за один проход.
+
+    Возвращает словарь со спецификациями, характеристиками, полным списком продавцов
+    [(имя, цена), ...] и флагом complete — есть ли в разметке все нужные блоки.
+    groups (см. FIELD_GROUPS) ограничивает разбор: блоки других групп не ищутся и
+    остаются пустыми; None — все группы.
+    """
+    backend = get_backend(backend)
+    doc = backend.parse(html)
+    wanted = PRODUCT_GROUPS if groups is None else PRODUCT_GROUPS & set(groups)
+
+    short_specs = backend.select(doc, 'short_specs') if 'specs' in wanted else []
+    specifications = {}
+    for spec in short_specs:
+        text = _text(backend, spec)
+        if ':' in text:
+            k, v = text.split(':', 1)
+            specifications[k.strip()] = v.strip()
+
+    spec_nodes = backend.select(doc, 'characteristics') if 'characteristics' in wanted else []
+    characteristics = {}
+    for spec in spec_nodes:
+        term = backend.select_one(spec, 'spec_term')
+        val = backend.select_one(spec, 'spec_value')
+        if term is not None and val is not None:
+            characteristics[_text(backend, term)] = _text(backend, val)
+
+    sellers_table = backend.select_one(doc, 'sellers_table') if 'sellers' in wanted else None
+    sellers = []
+    if sellers_table is not None:
+        unique_sellers = set()
+        for row in backend.select(sellers_table, 'seller_rows'):
+            link_el = backend.select_one(row, 'seller_link')
+            if link_el is None:
+                continue
+            name = _text(backend, link_el)
+            price_el = backend.select_one(row, 'seller_price')
+            price = _WHITESPACE.sub(' ', backend.text(price_el).replace('\xa0', '')) if price_el is not None else None
+            if name not in unique_sellers:
+                sellers.append((name, price))
+                unique_sellers.add(name)
+
+    return {
+        'specifications': specifications,
+        'characteristics': characteristics,
+        'sellers': sellers,
+        'complete': ((bool(short_specs) or 'specs' not in wanted)
+                     and (bool(spec_nodes) or 'characteristics' not in wanted)
+                     and (sellers_table is not None or 'sellers' not in wanted)),
+    }
+
+
+def select_groups(page, groups):
+    """Страница только с запрошенными группами: остальные блоки очищаются."""
+    return {
+        **page,
+        'specifications': page['specifications'] if 'specs' in groups else {},
+        'characteristics': page['characteristics'] if 'characteristics' in groups else {},
+        'sellers': page['sellers'] if 'sellers' in groups else [],
+    }
+
+
+def parse_price(text):
+    """'123 990 ₸' -> 123990; None, если цифр нет."""
+    digits = ''.join(ch for ch in text or '' if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def parse_rating(text):
+    """'4.5' -> 4.5; None для «Нет рейтинга»."""
+    match = _NUMBER.search(text or '')
+    return float(match.group().replace(',', '.')) if match else None
+
+
+def build_details(page):
+    result = {**page['specifications'], **page['characteristics']}
+    for i, (name, price) in enumerate(page['sellers'][:MAX_SELLERS]):
+        result[f"Seller_{i + 1}"] = name
+        result[f"Price_{i + 1}"] = price
+    result[OFFERS_FIELD] = [tuple(seller) for seller in page['sellers']]
+    return result
+
+
+def card_rating(backend, product):
+    """Оценка товара из класса звёзд карточки ('_90' -> '4.5') или «Нет рейтинга».
+
+    Текст блока рейтинга — число отзывов, а не оценка, поэтому его здесь не читаем.
+    """
+    stars = backend.select_one(product, 'card_stars')
+    for token in (backend.attr(stars, 'class') or '').split() if stars is not None else ():
+        match = _STARS.match(token)
+        if match:
+            return f"{int(match.group(1)) / 20:g}"
+    return 'Нет рейтинга'
+
+
+def extract_cards(html, backend=None):
+    """Карточки товаров со страницы каталога.
+
+    Возвращает (cards, skipped): ссылки в cards относительные, как в разметке;
+    skipped — число карточек без названия, ссылки или цены.
+    """
+    backend = get_backend(backend)
+    doc = backend.parse(html)
+    cards, skipped = [], 0
+    for product in backend.select(doc, 'cards'):
+        name_el = backend.select_one(product, 'card_name')
+        link_el = backend.select_one(product, 'card_link')
+        price_el = backend.select_one(product, 'card_price')
+        href = backend.attr(link_el, 'href') if link_el is not None else None
+        if name_el is None or not href or price_el is None:
+            skipped += 1
+            continue
+        cards.append({
+            'Название': _text(backend, name_el),
+            'Ссылка': href,
+            'Цена': _text(backend, price_el),
+            'Рейтинг': card_rating(backend, product),
+            'Отзывы': parse_price(_text(backend, backend.select_one(product, 'card_reviews'))),
+        })
+    return cards, skipped
+
+
+def extract_pagination(html, backend=None):
+    """(последний видимый номер страницы или None, есть ли активная «Следующая»)."""
+    backend = get_backend(backend)
+    doc = backend.parse(html)
+    numbers, has_next = [], False
+    for el in backend.select(doc, 'pagination'):
+        text = _text(backend, el)
+        if text.isdigit():
+            numbers.append(int(text))
+        elif text == 'Следующая':
+            has_next = not is_disabled(backend.attr(el, 'class'))
+    return (max(numbers) if numbers else None), has_next
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import aiohttp
+
+DEFAULT_HEADERS = {
+    'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    'Accept': "text/html,application/xhtml+xml",
+    'Accept-Language': "ru-RU,ru;q=0.9",
+}
+
+
+class HttpFetcher:
+    """Загрузка страниц товаров без браузера через общий keep-alive пул соединений.
+
+    Цикл asyncio работает в отдельном потоке, а fetch() можно вызывать из любого
+    потока: одновременно выполняется не больше concurrency запросов, а при заданном
+    limiter — не чаще, чем он разрешает.
+    """
+
+    def __init__(self, concurrency=8, timeout=15, headers=None, limiter=None):
+        self.concurrency = concurrency
+        self.limiter = limiter
+        self.timeout = timeout
+        self.headers = headers or DEFAULT_HEADERS
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._semaphore = None
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http-fetcher", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+        return self
+
+    async def _open(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60),
+        )
+
+    async def _fetch(self, url):
+        async with self._semaphore:
+            async with self._session.get(url) as response:
+                if response.status != 200:
+                    return None
+                return await response.text()
+
+    def fetch(self, url):
+        """Возвращает HTML страницы или None, если сервер ответил не 200."""
+        if self.limiter:
+            self.limiter.acquire()
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self._loop).result()
+
+    def close(self):
+        if not self._loop:
+            return
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
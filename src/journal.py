@@ -0,0 +1,102 @@
+import json
+import sqlite3
+import threading
+import time
+
+from src.paths import app_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    run_id INTEGER NOT NULL,
+    page_num INTEGER NOT NULL,
+    page_url TEXT NOT NULL,
+    cards INTEGER NOT NULL,
+    PRIMARY KEY (run_id, page_num)
+);
+CREATE TABLE IF NOT EXISTS items (
+    run_id INTEGER NOT NULL,
+    link TEXT NOT NULL,
+    page_num INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (run_id, link)
+);
+"""
+
+
+class RunJournal:
+    """Журнал запуска в SQLite: пройденные страницы каталога и уже собранные товары.
+
+    Каждая запись фиксируется сразу, поэтому после падения Chrome или закрытия
+    приложения запуск можно продолжить с первой недособранной страницы.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or app_path('journal.sqlite3')
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor
+
+    def start_run(self, url):
+        now = time.time()
+        return self._execute("INSERT INTO runs (url, status, started_at, updated_at) VALUES (?, 'running', ?, ?)",
+                             (url, now, now)).lastrowid
+
+    def find_unfinished(self, url):
+        """id последнего запуска по этому URL, если он не был завершён, иначе None."""
+        row = self._execute("SELECT id, status FROM runs WHERE url = ? ORDER BY id DESC LIMIT 1", (url,)).fetchone()
+        if row and row[1] != 'done':
+            return row[0]
+        return None
+
+    def finish_run(self, run_id, status):
+        self._execute("UPDATE runs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), run_id))
+
+    def add_page(self, run_id, page_num, page_url, cards):
+        self._execute("INSERT OR REPLACE INTO pages (run_id, page_num, page_url, cards) VALUES (?, ?, ?, ?)",
+                      (run_id, page_num, page_url, cards))
+        self._execute("UPDATE runs SET updated_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def add_item(self, run_id, link, page_num, row):
+        self._execute("INSERT OR REPLACE INTO items (run_id, link, page_num, row) VALUES (?, ?, ?, ?)",
+                      (run_id, link, page_num, json.dumps(row, ensure_ascii=False)))
+
+    def done_links(self, run_id):
+        return {link for (link,) in self._execute("SELECT link FROM items WHERE run_id = ?", (run_id,))}
+
+    def rows(self, run_id):
+        """Уже собранные строки в порядке сбора; вызывать до запуска воркеров."""
+        for (row,) in self._conn.execute("SELECT row FROM items WHERE run_id = ? ORDER BY rowid", (run_id,)):
+            yield json.loads(row)
+
+    def resume_point(self, run_id):
+        """(номер, URL) первой страницы, где собраны не все товары; если таких нет — последней."""
+        pages = self._execute("""
+            SELECT p.page_num, p.page_url, p.cards,
+                   (SELECT COUNT(*) FROM items i WHERE i.run_id = p.run_id AND i.page_num = p.page_num)
+            FROM pages p WHERE p.run_id = ? ORDER BY p.page_num
+        """, (run_id,)).fetchall()
+        if not pages:
+            return None
+        for page_num, page_url, cards, done in pages:
+            if done < cards:
+                return page_num, page_url
+        return pages[-1][0], pages[-1][1]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
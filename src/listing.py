@@ -0,0 +1,85 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.metrics import stage
+from src.waits import LISTING_READY
+
+PAGE_PARAM = 'page'
+CARD_MARKER = 'item-card__info'
+
+
+def page_url(url, page):
+    """URL страницы каталога по номеру: ?page=N, у первой страницы параметра нет."""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != PAGE_PARAM]
+    if page > 1:
+        query.append((PAGE_PARAM, str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class ListingLoader:
+    """Параллельная загрузка страниц каталога по прямым URL.
+
+    Страницы открываются в сессиях общего пула браузеров. Если передан HTTP-клиент,
+    страница сначала запрашивается без браузера и открывается в нём, только когда
+    карточек в ответе нет.
+    """
+
+    def __init__(self, pool, waiter, fetcher=None, workers=3, should_stop=lambda: False, metrics=None):
+        self.pool = pool
+        self.waiter = waiter
+        self.fetcher = fetcher
+        self.workers = max(1, workers)
+        self.should_stop = should_stop
+        self.metrics = metrics
+
+    def _load(self, driver, url):
+        self.waiter.get(driver, url)
+        self.waiter.until(driver, LISTING_READY, 'listing')
+        return driver.page_source
+
+    def fetch(self, url):
+        """HTML страницы каталога или None, если загрузить её не удалось."""
+        with stage(self.metrics, 'listing_load'):
+            return self._fetch(url)
+
+    def _fetch(self, url):
+        if self.fetcher:
+            try:
+                html = self.fetcher.fetch(url)
+            except Exception:
+                html = None
+            if html and CARD_MARKER in html:
+                return html
+        return self.pool.run(self._load, url, self.should_stop) or None
+
+    def pages(self, url, start, last_page, prefetched=None):
+        """(номер, URL, HTML) по порядку, начиная со start.
+
+        last_page() спрашивается перед каждой новой загрузкой: номер последней страницы
+        может вырасти по ходу обхода. Вперёд загружается не больше workers страниц,
+        чтобы не обгонять конвейер карточек. prefetched — уже загруженные страницы {номер: HTML}.
+        """
+        prefetched = prefetched or {}
+        pending = deque()
+        next_number = start
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="listing")
+
+        def submit():
+            nonlocal next_number
+            while len(pending) < self.workers and next_number <= last_page():
+                target = page_url(url, next_number)
+                future = None if next_number in prefetched else executor.submit(self.fetch, target)
+                pending.append((next_number, target, future))
+                next_number += 1
+
+        try:
+            submit()
+            while pending:
+                number, target, future = pending.popleft()
+                html = prefetched[number] if future is None else future.result()
+                yield number, target, html
+                submit()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
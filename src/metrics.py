@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+
+def stage(metrics, name):
+    """metrics.time(name) или пустой контекст, если метрики не собираются."""
+    return metrics.time(name) if metrics else nullcontext()
+
+
+def _quantile(samples, q):
+    return samples[int(q * (len(samples) - 1))] if samples else None
+
+
+class RunMetrics:
+    """Время этапов парсинга и скорость сбора товаров.
+
+    По каждому этапу (загрузка страницы, клик по вкладке, разбор HTML, запись строки...)
+    хранится гистограмма по BUCKETS для экспорта и окно последних window замеров
+    для p50/p95. Методы можно вызывать из любого потока.
+    """
+
+    def __init__(self, window=5000):
+        self.started = time.monotonic()
+        self._window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._buckets = {}
+        self._sums = {}
+        self._counts = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self._window)
+                self._buckets[name] = [0] * len(BUCKETS)
+                self._sums[name] = 0.0
+                self._counts[name] = 0
+            self._samples[name].append(seconds)
+            self._sums[name] += seconds
+            self._counts[name] += 1
+            buckets = self._buckets[name]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+                    break
+
+    @contextmanager
+    def time(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def rate_per_minute(self, name='products'):
+        elapsed = self.elapsed()
+        return self.counters.get(name, 0) * 60 / elapsed if elapsed > 0 else 0.0
+
+    def eta(self, done, total):
+        """Оценка оставшегося времени, с; None, пока скорость или объём неизвестны."""
+        rate = self.rate_per_minute()
+        if not total or not rate or done >= total:
+            return None
+        return (total - done) * 60 / rate
+
+    def stages(self):
+        """{этап: {'count', 'total', 'p50', 'p95'}} по убыванию суммарного времени."""
+        with self._lock:
+            data = {name: (sorted(self._samples[name]), self._counts[name], self._sums[name])
+                    for name in self._samples}
+        result = {name: {'count': count, 'total': round(total, 3),
+                         'p50': round(_quantile(samples, 0.5), 3), 'p95': round(_quantile(samples, 0.95), 3)}
+                  for name, (samples, count, total) in data.items()}
+        return dict(sorted(result.items(), key=lambda item: -item[1]['total']))
+
+    def summary(self):
+        stages = self.stages()
+        if not stages:
+            return "нет данных"
+        return "; ".join(f"{name} p50={s['p50']:.2f}с p95={s['p95']:.2f}с всего {s['total']:.0f}с"
+                         for name, s in stages.items())
+
+    def snapshot(self):
+        with self._lock:
+            counters, gauges = dict(self.counters), dict(self.gauges)
+        return {
+            'elapsed': round(self.elapsed(), 3),
+            'products_per_minute': round(self.rate_per_minute(), 2),
+            'counters': counters,
+            'gauges': gauges,
+            'stages': self.stages(),
+        }
+
+    def to_prometheus(self):
+        """Текст в формате Prometheus textfile (node_exporter textfile collector)."""
+        lines = [
+            "# TYPE kaspi_run_seconds gauge",
+            f"kaspi_run_seconds {self.elapsed():.3f}",
+            "# TYPE kaspi_products_per_minute gauge",
+            f"kaspi_products_per_minute {self.rate_per_minute():.3f}",
+        ]
+        with self._lock:
+            counters, gauges = dict(self.counters), dict(self.gauges)
+            histograms = {name: (list(self._buckets[name]), self._sums[name], self._counts[name])
+                          for name in self._samples}
+        for name, value in sorted(counters.items()):
+            lines += [f"# TYPE kaspi_{name}_total counter", f"kaspi_{name}_total {value}"]
+        for name, value in sorted(gauges.items()):
+            lines += [f"# TYPE kaspi_{name} gauge", f"kaspi_{name} {value}"]
+        lines.append("# TYPE kaspi_stage_seconds histogram")
+        for name, (buckets, total, count) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                lines.append(f'kaspi_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'kaspi_stage_seconds_sum{{stage="{name}"}} {total:.3f}')
+            lines.append(f'kaspi_stage_seconds_count{{stage="{name}"}} {count}')
+        lines.append("# TYPE kaspi_stage_quantile_seconds gauge")
+        for name, s in self.stages().items():
+            lines.append(f'kaspi_stage_quantile_seconds{{stage="{name}",quantile="0.5"}} {s["p50"]}')
+            lines.append(f'kaspi_stage_quantile_seconds{{stage="{name}",quantile="0.95"}} {s["p95"]}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Сохраняет метрики: .prom — Prometheus textfile, иначе JSON."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if path.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        # textfile collector не должен увидеть недописанный файл
+        os.replace(tmp_path, path)
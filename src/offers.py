@@ -0,0 +1,137 @@
+"""Ценовая аналитика по предложениям продавцов.
+
+Из результатов парсинга собирается длинная таблица предложений (ссылка, продавец, цена)
+и по каждому товару считаются минимальная, медианная и максимальная цена, число
+продавцов и место своего магазина. Всё делается операциями pandas над столбцами,
+без циклов по строкам, поэтому сотни тысяч предложений обрабатываются за секунды.
+
+Источник — таблица offers.parquet из типизированного вывода (полный список продавцов)
+или любой другой файл результата, где есть только колонки Seller_i/Price_i.
+
+Запуск:
+    python -m src.offers kaspi_data.parquet --shop "Мой магазин" -o prices.csv
+"""
+import argparse
+import os
+import sys
+
+from src.extract import MAX_SELLERS
+from src.writers import companion_path
+
+OFFER_COLUMNS = ['Ссылка', 'Продавец', 'Цена']
+
+
+def numeric_prices(prices):
+    """'123 990 ₸' -> 123990 для целого столбца; пустые и нечисловые значения -> <NA>."""
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(prices):
+        return prices.astype('Int64')
+    digits = prices.astype('string').str.replace(r'\D', '', regex=True)
+    return pd.to_numeric(digits.mask(digits == ''), errors='coerce').astype('Int64')
+
+
+def offers_from_wide(products):
+    """Предложения из колонок Seller_i/Price_i (первые MAX_SELLERS продавцов товара)."""
+    import pandas as pd
+
+    parts = []
+    for i in range(1, MAX_SELLERS + 1):
+        seller, price = f"Seller_{i}", f"Price_{i}"
+        if seller not in products or price not in products:
+            break
+        part = products[['Ссылка', seller, price]]
+        part.columns = OFFER_COLUMNS
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=OFFER_COLUMNS)
+    offers = pd.concat(parts, ignore_index=True)
+    return offers[offers['Продавец'].notna()]
+
+
+def read_table(path):
+    import pandas as pd
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.xlsx':
+        return pd.read_excel(path)
+    if ext == '.csv':
+        return pd.read_csv(path, dtype=str)
+    if ext == '.jsonl':
+        return pd.read_json(path, lines=True, dtype=False)
+    if ext == '.json':
+        return pd.read_json(path, dtype=False)
+    raise ValueError(f"Неизвестный формат файла: {path}")
+
+
+def load_offers(path):
+    """Предложения из файла результата: полный список, если рядом есть offers.parquet."""
+    offers_path = companion_path(path, 'offers')
+    if path.endswith('.parquet') and os.path.exists(offers_path):
+        offers = read_table(offers_path)[OFFER_COLUMNS]
+    else:
+        offers = offers_from_wide(read_table(path))
+    offers = offers.assign(Цена=numeric_prices(offers['Цена']))
+    return offers[offers['Цена'].notna()]
+
+
+def price_stats(offers, shop=None):
+    """Сводка по товарам: цены, число продавцов и, если задан shop, место магазина.
+
+    Место считается по возрастанию цены (1 — самое дешёвое предложение, при равной цене
+    места одинаковые); «До лидера» — на сколько цена магазина выше минимальной.
+    """
+    prices = offers['Цена'].astype('float64')
+    grouped = prices.groupby(offers['Ссылка'], sort=False)
+    stats = grouped.agg(['min', 'median', 'max', 'count'])
+    stats.columns = ['Мин. цена', 'Медиана', 'Макс. цена', 'Продавцов']
+    stats = stats.astype({'Мин. цена': 'Int64', 'Макс. цена': 'Int64', 'Продавцов': 'int64'})
+    if shop:
+        ranks = grouped.rank(method='min')
+        own = offers['Продавец'].astype('string').str.casefold() == shop.casefold()
+        mine = (offers.loc[own, ['Ссылка']]
+                .assign(**{'Цена магазина': prices[own], 'Место магазина': ranks[own]})
+                .groupby('Ссылка', sort=False).min())
+        stats = stats.join(mine)
+        stats['Цена магазина'] = stats['Цена магазина'].astype('Int64')
+        stats['Место магазина'] = stats['Место магазина'].astype('Int64')
+        stats['До лидера'] = stats['Цена магазина'] - stats['Мин. цена']
+    return stats.reset_index()
+
+
+def write_table(frame, path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        frame.to_parquet(path, index=False)
+    elif ext == '.xlsx':
+        frame.to_excel(path, index=False)
+    elif ext == '.jsonl':
+        frame.to_json(path, orient='records', lines=True, force_ascii=False)
+    elif ext == '.json':
+        frame.to_json(path, orient='records', force_ascii=False)
+    else:
+        frame.to_csv(path, index=False)
+
+
+def price_report(source, output, shop=None):
+    """Считает сводку по файлу результата и сохраняет её в output. Возвращает число товаров."""
+    stats = price_stats(load_offers(source), shop)
+    write_table(stats, output)
+    return len(stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ценовая сводка по предложениям продавцов")
+    parser.add_argument('source', help="файл результата парсинга (.parquet, .xlsx, .csv, .json, .jsonl)")
+    parser.add_argument('-o', '--output', required=True, help="куда сохранить сводку; формат по расширению")
+    parser.add_argument('--shop', help="название своего магазина для расчёта места")
+    args = parser.parse_args(argv)
+    count = price_report(args.source, args.output, args.shop)
+    print(f"Товаров в сводке: {count} -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
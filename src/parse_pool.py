@@ -0,0 +1,61 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.extract import extract_cards, extract_product, get_backend
+
+
+def default_processes(http_engine=False):
+    """Сколько процессов разбора брать по умолчанию: одно ядро оставляем браузерам и интерфейсу.
+
+    В HTTP-режиме 0: страницы приходят быстрее, чем их выгодно передавать в процессы, и
+    пересылка HTML дороже самого разбора (benchmarks/bench_suite.py, «http x8, разбор»).
+    """
+    if http_engine:
+        return 0
+    cpus = os.cpu_count() or 1
+    return min(4, cpus - 1) if cpus > 2 else 0
+
+
+def _warm_up():
+    # Импорт парсера и компиляция селекторов в дочернем процессе до первой страницы
+    get_backend()
+    return os.getpid()
+
+
+class ParsePool:
+    """Разбор HTML (src.extract) в отдельных процессах.
+
+    Потоки браузеров только передают сюда page_source и сразу идут на следующую
+    страницу, а разбор не держит GIL и не мешает циклу событий Qt. Из процессов
+    возвращаются компактные словари extract_product/extract_cards. При processes=0
+    разбор выполняется в вызывающем потоке с тем же интерфейсом.
+    """
+
+    def __init__(self, processes=0):
+        self.processes = processes
+        self._executor = None
+        if processes:
+            # spawn, а не fork: в процессе уже работают потоки Selenium и asyncio
+            self._executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+            for _ in range(processes):
+                self._executor.submit(_warm_up)
+
+    def submit_product(self, html, groups=None):
+        """Ставит страницу товара в разбор и возвращает функцию, которая дождётся результата."""
+        if not self._executor:
+            return lambda: extract_product(html, groups=groups)
+        return self._executor.submit(extract_product, html, None, groups).result
+
+    def product(self, html, groups=None):
+        return self.submit_product(html, groups)()
+
+    def cards(self, html):
+        if not self._executor:
+            return extract_cards(html)
+        return self._executor.submit(extract_cards, html).result()
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
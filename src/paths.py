@@ -0,0 +1,9 @@
+import os
+
+APP_DIR = os.path.join(os.path.expanduser('~'), '.kaspifreesoft')
+
+
+def app_path(name):
+    """Путь к служебному файлу приложения (журнал, кэш) в домашней папке пользователя."""
+    os.makedirs(APP_DIR, exist_ok=True)
+    return os.path.join(APP_DIR, name)
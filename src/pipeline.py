@@ -0,0 +1,171 @@
+import queue
+import threading
+import time
+
+from src.retry import backoff_delay, sleep_unless
+
+_DONE = object()
+
+
+class DetailPipeline:
+    """Конвейер: обход страниц каталога -> ограниченная очередь -> воркеры карточек товаров.
+
+    Страницы каталога кладут карточки через put(); если очередь заполнена, обход
+    каталога ждёт (backpressure). Результаты передаются в on_result(card, details)
+    строго в порядке поступления карточек.
+
+    Если задан fast_task(link), он вызывается первым; браузер из пула берётся только
+    когда fast_task вернул None. task может вернуть функцию без аргументов вместо
+    результата: её вызывает воркер уже после возврата сессии в пул (так разбор HTML
+    в отдельном процессе не держит браузер; чтобы сессия не простаивала, воркеров нужно
+    больше, чем сессий). Карточка, переданная в put() вместе с details, проходит
+    конвейер без загрузки страницы, но сохраняет своё место в порядке вывода.
+
+    Товар, на котором task упал или вернул пустой результат, не задерживает вывод: он
+    откладывается и в finish() повторяется до retries раз с экспоненциальной паузой и
+    джиттером. Что не удалось и тогда, уходит в on_result с пустыми details. breaker
+    (src/retry.py) останавливает воркеров на паузу, когда ошибок становится слишком много.
+    """
+
+    def __init__(self, pool, task, on_result, queue_size=50, should_stop=lambda: False,
+                 fast_task=None, workers=None, retries=0, breaker=None):
+        self.pool = pool
+        self.task = task
+        self.fast_task = fast_task
+        self.workers = workers or pool.size
+        self.on_result = on_result
+        self.should_stop = should_stop
+        self.retries = retries
+        self.breaker = breaker
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._next_seq = 0
+        self._pending = {}
+        self.producer_wait = 0.0
+        self.consumer_wait = 0.0
+        self.fast_hits = 0
+        self.fallbacks = 0
+        self._failed = []
+        self.retried = 0
+        self.recovered = 0
+        self.incomplete = 0
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"detail-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def put(self, card, details=None):
+        started = time.perf_counter()
+        while True:
+            try:
+                self.queue.put((self._seq, card, details), timeout=0.5)
+                self._seq += 1
+                break
+            except queue.Full:
+                if self.should_stop():
+                    break
+        self.producer_wait += time.perf_counter() - started
+
+    def _drain(self):
+        for _ in self._threads:
+            self.queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def finish(self):
+        """Дожидается всех карточек, затем повторяет отложенные неудачные товары."""
+        self._drain()
+        for attempt in range(1, self.retries + 1):
+            if not self._failed or self.should_stop():
+                break
+            failed, self._failed = self._failed, []
+            delay = backoff_delay(attempt)
+            self.pool.log(f"Повтор {attempt}/{self.retries} для {len(failed)} товаров через {delay:.1f}с")
+            if not sleep_unless(delay, self.should_stop):
+                self._failed = failed
+                break
+            self.retried += len(failed)
+            self.start()
+            for card in failed:
+                self.put(card)
+            self._drain()
+            self.recovered += len(failed) - len(self._failed)
+        failed, self._failed = self._failed, []
+        self.incomplete += len(failed)
+        for card in failed:
+            self.on_result(card, {})
+
+    def _worker(self):
+        while True:
+            started = time.perf_counter()
+            item = self.queue.get()
+            with self._lock:
+                self.consumer_wait += time.perf_counter() - started
+            if item is _DONE:
+                return
+            seq, card, details = item
+            if details is None and self.breaker and not self.breaker.before_call(self.should_stop):
+                self._deliver(seq, card, None)
+                continue
+            loaded, failed = details is None, False
+            try:
+                if details is None and self.fast_task and not self.should_stop():
+                    details = self.fast_task(card['Ссылка'])
+                    with self._lock:
+                        if details is None:
+                            self.fallbacks += 1
+                        else:
+                            self.fast_hits += 1
+                if details is None:
+                    details = self.pool.run(self.task, card['Ссылка'], self.should_stop)
+                    if callable(details):
+                        details = details()
+                    # None — остановка до начала загрузки, {} — товар не загрузился
+                    failed = details == {}
+            except Exception as e:
+                self.pool.log(f"Ошибка: {e}")
+                failed = True
+            if self.breaker and loaded and (failed or details):
+                self.breaker.record(not failed)
+            if failed and self.retries:
+                with self._lock:
+                    self._failed.append(card)
+                details = None
+            elif failed:
+                details = {}
+            self._deliver(seq, card, details)
+
+    def _deliver(self, seq, card, details):
+        with self._lock:
+            self._pending[seq] = (card, details)
+            while self._next_seq in self._pending:
+                card, details = self._pending.pop(self._next_seq)
+                self._next_seq += 1
+                if details is not None:
+                    self.on_result(card, details)
+
+    def depth(self):
+        return f"{self.queue.qsize()}/{self.queue.maxsize}"
+
+    def bottleneck(self):
+        """Стадия, которая тормозит конвейер: та, которую дольше всего ждёт соседняя."""
+        if self.producer_wait > self.consumer_wait / self.workers:
+            return "карточки товаров"
+        return "страницы каталога"
+
+    def stats(self):
+        text = (f"очередь {self.depth()}, ожидание каталога {self.producer_wait:.1f}с, "
+                f"простой воркеров {self.consumer_wait:.1f}с")
+        if self.fast_task:
+            text += f", без браузера {self.fast_hits} / браузер {self.fallbacks}"
+        if self.retried or self._failed:
+            text += f", отложено {len(self._failed)}, повторено {self.retried}, восстановлено {self.recovered}"
+        if self.incomplete:
+            text += f", неполных {self.incomplete}"
+        return text
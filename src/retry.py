@@ -0,0 +1,64 @@
+import random
+import threading
+import time
+from collections import deque
+
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """Пауза перед попыткой attempt (1, 2, ...): экспонента с полным джиттером."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def sleep_unless(seconds, should_stop=lambda: False, step=0.5):
+    """Спит seconds секунд, но просыпается раньше по should_stop(). False — если остановлены."""
+    deadline = time.monotonic() + seconds
+    while not should_stop():
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return True
+        time.sleep(min(step, left))
+    return False
+
+
+class CircuitBreaker:
+    """Пауза обхода при всплеске ошибок: сайт троттлит или недоступен.
+
+    Считает долю ошибок в окне последних window товаров. Когда она не меньше threshold
+    (и замеров хотя бы min_calls), цепь размыкается: before_call() держит воркеров
+    cooldown секунд. Затем окно очищается и запросы идут снова; если ошибки
+    продолжаются сразу после паузы, следующая пауза вдвое длиннее, до max_cooldown.
+    """
+
+    def __init__(self, window=50, threshold=0.5, min_calls=10, cooldown=30.0, max_cooldown=300.0, log=None):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.log = log or (lambda message: None)
+        self.cooldown = cooldown
+        self.opened = 0
+        self._results = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ok):
+        with self._lock:
+            self._results.append(ok)
+            if ok:
+                self.cooldown = self.base_cooldown
+                return
+            if time.monotonic() < self._open_until or len(self._results) < self.min_calls:
+                return
+            rate = self._results.count(False) / len(self._results)
+            if rate < self.threshold:
+                return
+            self._open_until = time.monotonic() + self.cooldown
+            self._results.clear()
+            self.opened += 1
+            cooldown, self.cooldown = self.cooldown, min(self.max_cooldown, self.cooldown * 2)
+        self.log(f"Ошибок {rate:.0%} за последние товары — пауза {cooldown:.0f}с, сайт может ограничивать запросы")
+
+    def before_call(self, should_stop=lambda: False):
+        """Ждёт, пока цепь разомкнута. False — если за это время пришла остановка."""
+        left = self._open_until - time.monotonic()
+        return sleep_unless(left, should_stop) if left > 0 else not should_stop()
@@ -0,0 +1,53 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+from src.paths import app_path
+
+
+def print_log(message, **context):
+    """log по умолчанию: печатает только текст сообщения."""
+    print(message)
+
+
+class RunLog:
+    """Лог запуска для интерфейса: кольцевой буфер строк и JSON Lines файл с ротацией.
+
+    Вызывается как log(message, **context) из любого потока. Строки для окна копятся
+    в буфере на capacity записей (при переполнении старые отбрасываются), интерфейс
+    забирает их пачкой через drain() по таймеру. В файл пишется каждая запись целиком:
+    время, текст и контекст (номер страницы, ссылка товара).
+    """
+
+    def __init__(self, path=None, capacity=2000, max_bytes=5 * 1024 * 1024, backups=3, **fields):
+        self.path = path or app_path('run_log.jsonl')
+        self.fields = fields
+        self._lines = deque(maxlen=capacity)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._file = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        self._file.setFormatter(logging.Formatter('%(message)s'))
+
+    def __call__(self, message, **context):
+        now = time.time()
+        line = f"[{time.strftime('%H:%M:%S', time.localtime(now))}] {message}"
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(line)
+        record = {'ts': round(now, 3), 'message': message, **self.fields, **context}
+        self._file.handle(logging.makeLogRecord({'msg': json.dumps(record, ensure_ascii=False)}))
+
+    def drain(self):
+        """Накопленные строки и сколько строк вытеснено из буфера с прошлого вызова."""
+        with self._lock:
+            lines, dropped = list(self._lines), self._dropped
+            self._lines.clear()
+            self._dropped = 0
+        return lines, dropped
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,155 @@
+import heapq
+import itertools
+import threading
+from functools import partial
+
+from src.browser_pool import BrowserPool, blocked_patterns, create_driver, is_alive, launch_driver, quit_driver
+from src.cache import DetailCache
+from src.engine import ScrapeEngine
+from src.metrics import RunMetrics
+from src.parse_pool import ParsePool, default_processes
+from src.ratelimit import TokenBucket
+from src.runlog import print_log
+
+
+class CatalogJob:
+    def __init__(self, number, url, priority=0, writer=None, output_path=None, format_type=None):
+        self.number = number
+        self.url = url
+        self.priority = priority
+        self.writer = writer
+        self.output_path = output_path
+        self.format_type = format_type
+        self.rows = 0
+        self.error = None
+
+
+class JobScheduler:
+    """Очередь каталогов с общим лимитом параллельных заданий и частоты запросов.
+
+    Задания с большим priority запускаются раньше. Все задания работают на общем пуле
+    браузеров для карточек товаров, общем HTTP-клиенте, кэше и процессах разбора HTML, а каждый запрос к сайту
+    проходит через один TokenBucket на rate запросов в секунду. Метрики всех заданий
+    копятся в общем RunMetrics и в конце сохраняются в metrics_path.
+
+    Страницы каталогов каждый поток заданий листает в своей сессии Chrome, которая
+    переходит от задания к заданию; сессия первого потока — пробная из run().
+    """
+
+    def __init__(self, max_concurrent=2, rate=None, burst=None, log=None, metrics_path=None, **engine_options):
+        self.max_concurrent = max(1, max_concurrent)
+        self.metrics = RunMetrics()
+        self.metrics_path = metrics_path
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.log = log or print_log
+        self.engine_options = engine_options
+        self.jobs = []
+        self._queue = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._engines = set()
+        self._stopping = False
+
+    def submit(self, url, priority=0, writer=None, output_path=None, format_type=None):
+        job = CatalogJob(len(self.jobs) + 1, url, priority, writer, output_path, format_type)
+        self.jobs.append(job)
+        heapq.heappush(self._queue, (-priority, next(self._order), job))
+        return job
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            engines = list(self._engines)
+        for engine in engines:
+            engine.stop()
+
+    def _job_log(self, job):
+        if len(self.jobs) == 1:
+            return self.log
+        label = f"[{job.number}/{len(self.jobs)}]"
+        return lambda message, **context: self.log(f"{label} {message}", **context)
+
+    def _next_job(self):
+        with self._lock:
+            if self._stopping or not self._queue:
+                return None
+            return heapq.heappop(self._queue)[2]
+
+    def run(self):
+        """Выполняет все задания и возвращает общее число строк."""
+        options = dict(self.engine_options)
+        blocked = (blocked_patterns(options.get('block'), options.get('block_extra', ()))
+                   if options.get('lean') else None)
+        # Пробный запуск заодно проверяет, что закэшированный chromedriver подходит к Chrome;
+        # потом в этой сессии листает каталоги первый поток заданий
+        probe, driver_path = launch_driver(blocked, self.log)
+        pool = BrowserPool(partial(create_driver, driver_path, blocked), size=options.get('workers', 3),
+                           log=self.log, max_pages=options.get('recycle_pages', 300),
+                           max_memory_mb=options.get('recycle_memory_mb', 1500)).start()
+        fetcher = None
+        if options.get('http_engine'):
+            from src.http_fetch import HttpFetcher
+            fetcher = HttpFetcher(concurrency=options.get('http_concurrency', 8), limiter=self.limiter).start()
+        processes = options.get('parse_processes')
+        parser = ParsePool(default_processes(options.get('http_engine')) if processes is None else processes)
+        cache = None
+        if options.get('cache_specs_ttl', 0) > 0:
+            cache = DetailCache(specs_ttl=options['cache_specs_ttl'], sellers_ttl=options.get('cache_sellers_ttl', 0))
+
+        def worker(driver):
+            try:
+                while True:
+                    job = self._next_job()
+                    if job is None:
+                        return
+                    log = self._job_log(job)
+                    if driver is None or not is_alive(driver):
+                        quit_driver(driver)
+                        try:
+                            driver = create_driver(driver_path, blocked)
+                        except Exception as e:
+                            driver = None
+                            job.error = e
+                            log(f"Ошибка каталога: {e}")
+                            continue
+                    engine = ScrapeEngine(job.url, job.format_type, job.output_path, writer=job.writer, log=log,
+                                          pool=pool, fetcher=fetcher, cache=cache, limiter=self.limiter,
+                                          driver=driver, driver_path=driver_path, metrics=self.metrics,
+                                          parser=parser, **options)
+                    with self._lock:
+                        self._engines.add(engine)
+                    log(f"Запуск каталога (приоритет {job.priority}): {job.url}")
+                    try:
+                        job.rows = engine.run()
+                    except Exception as e:
+                        job.error = e
+                        log(f"Ошибка каталога: {e}")
+                    with self._lock:
+                        self._engines.discard(engine)
+            finally:
+                quit_driver(driver)
+
+        threads = [threading.Thread(target=worker, args=(probe if i == 0 else None,),
+                                    name=f"catalog-job-{i + 1}", daemon=True)
+                   for i in range(min(self.max_concurrent, len(self.jobs)))]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if not threads:
+                quit_driver(probe)
+            parser.close()
+            if fetcher:
+                fetcher.close()
+            if cache:
+                self.log(f"Кэш товаров: {cache.stats()}")
+                cache.close()
+            pool.close()
+            if self.limiter:
+                self.log(f"Ожидание ограничителя запросов: {self.limiter.waited:.1f}с")
+            if self.metrics_path:
+                self.metrics.export(self.metrics_path)
+                self.log(f"Метрики сохранены: {self.metrics_path}")
+        return sum(job.rows for job in self.jobs)
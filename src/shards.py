@@ -0,0 +1,395 @@
+"""Обход каталога шардами: несколько процессов или машин делят страницы каталога.
+
+Каталог делится на диапазоны страниц (шарды) в общей очереди SQLite. Каждый воркер
+забирает свободный шард с арендой на lease секунд, продлевает её, пока работает, и
+парсит свой диапазон обычным ScrapeEngine в отдельный JSON Lines файл. Шард упавшего
+воркера после истечения аренды достаётся другому. merge собирает файлы готовых шардов
+в один результат без повторов товаров.
+
+Очередь — один файл SQLite: для нескольких машин его кладут на общий диск, где
+работают блокировки файлов.
+
+Запуск:
+    python -m src.shards plan "https://kaspi.kz/shop/c/smartphones/" --pages-per-shard 5
+    python -m src.shards work --workers 3          # в нескольких процессах или на разных машинах
+    python -m src.shards merge -o phones.parquet
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+from src.cli import add_block_arguments, block_options
+from src.paths import app_path
+from src.runlog import print_log
+from src.writers import JsonLinesWriter, open_writer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    first_page INTEGER NOT NULL,
+    last_page INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    output TEXT,
+    rows INTEGER,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (url, first_page)
+);
+"""
+
+
+class Shard:
+    def __init__(self, id, url, first_page, last_page, attempts):
+        self.id = id
+        self.url = url
+        self.first_page = first_page
+        self.last_page = last_page
+        self.attempts = attempts
+
+    def __str__(self):
+        return f"шард {self.id}: страницы {self.first_page}–{self.last_page or 'конец'}"
+
+
+class ShardWriter(JsonLinesWriter):
+    """Вывод шарда: JSON Lines с полным списком продавцов для merge."""
+
+    keeps_offers = True
+
+
+class ShardQueue:
+    """Очередь шардов в SQLite, общая для всех воркеров.
+
+    Шард проходит pending -> running -> done. Захват и смена статуса идут в транзакциях
+    BEGIN IMMEDIATE, поэтому один шард не достанется двум воркерам. Если аренда running
+    шарда истекла, его снова может забрать любой воркер; после max_attempts неудачных
+    попыток шард помечается failed.
+    """
+
+    def __init__(self, path=None, max_attempts=3):
+        self.path = path or app_path('shards.sqlite3')
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _transaction(self, func):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def plan(self, url, total_pages, pages_per_shard):
+        """Делит страницы 1..total_pages на шарды; последний открыт до конца каталога,
+        потому что пагинация могла показать не все страницы. Уже заведённые шарды
+        этого URL не трогает. Возвращает число новых шардов."""
+        starts = range(1, max(total_pages, 1) + 1, max(pages_per_shard, 1))
+        bounds = [(first, first + pages_per_shard - 1) for first in starts]
+        bounds[-1] = (bounds[-1][0], None)
+        now = time.time()
+
+        def insert(conn):
+            added = 0
+            for first, last in bounds:
+                added += conn.execute("INSERT OR IGNORE INTO shards (url, first_page, last_page, updated_at) "
+                                      "VALUES (?, ?, ?, ?)", (url, first, last, now)).rowcount
+            return added
+
+        return self._transaction(insert)
+
+    def claim(self, owner, lease):
+        """Забирает свободный шард или шард с истёкшей арендой; None, если таких нет."""
+        def take(conn):
+            now = time.time()
+            row = conn.execute("""
+                SELECT id, url, first_page, last_page, attempts FROM shards
+                WHERE status = 'pending' OR (status = 'running' AND lease_until < ?)
+                ORDER BY id LIMIT 1
+            """, (now,)).fetchone()
+            if not row:
+                return None
+            conn.execute("UPDATE shards SET status = 'running', owner = ?, lease_until = ?, attempts = attempts + 1, "
+                         "updated_at = ? WHERE id = ?", (owner, now + lease, now, row[0]))
+            return Shard(row[0], row[1], row[2], row[3], row[4] + 1)
+
+        return self._transaction(take)
+
+    def renew(self, shard, owner, lease):
+        """Продлевает аренду; False, если шард уже забрал другой воркер."""
+        def update(conn):
+            now = time.time()
+            return conn.execute("UPDATE shards SET lease_until = ?, updated_at = ? "
+                                "WHERE id = ? AND owner = ? AND status = 'running'",
+                                (now + lease, now, shard.id, owner)).rowcount == 1
+
+        return self._transaction(update)
+
+    def complete(self, shard, owner, output, rows):
+        def update(conn):
+            return conn.execute("UPDATE shards SET status = 'done', output = ?, rows = ?, error = NULL, "
+                                "updated_at = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                                (output, rows, time.time(), shard.id, owner)).rowcount == 1
+
+        return self._transaction(update)
+
+    def fail(self, shard, owner, error):
+        status = 'failed' if shard.attempts >= self.max_attempts else 'pending'
+
+        def update(conn):
+            conn.execute("UPDATE shards SET status = ?, error = ?, lease_until = NULL, updated_at = ? "
+                         "WHERE id = ? AND owner = ? AND status = 'running'",
+                         (status, str(error), time.time(), shard.id, owner))
+
+        self._transaction(update)
+        return status
+
+    def outputs(self, url=None):
+        """Файлы готовых шардов по порядку страниц."""
+        sql = "SELECT output FROM shards WHERE status = 'done'"
+        params = ()
+        if url:
+            sql += " AND url = ?"
+            params = (url,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY url, first_page", params).fetchall()
+        return [output for (output,) in rows]
+
+    def stats(self):
+        with self._lock:
+            groups = self._conn.execute("SELECT status, COUNT(*), COALESCE(SUM(rows), 0) FROM shards "
+                                        "GROUP BY status").fetchall()
+        return {status: {'shards': count, 'rows': rows} for status, count, rows in groups}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def count_pages(url, log=None, lean=False, block=None, block_extra=()):
+    """Число страниц каталога по пагинации первой страницы (видимое окно номеров)."""
+    from src.browser_pool import blocked_patterns, launch_driver, quit_driver
+    from src.extract import extract_pagination
+    from src.waits import LISTING_READY, AdaptiveWaiter
+
+    driver, _ = launch_driver(blocked_patterns(block, block_extra) if lean else None, log)
+    try:
+        waiter = AdaptiveWaiter()
+        waiter.get(driver, url)
+        waiter.until(driver, LISTING_READY, 'listing')
+        visible, has_next = extract_pagination(driver.page_source)
+        return max(visible or 1, 2 if has_next else 1)
+    finally:
+        quit_driver(driver)
+
+
+class ShardWorker:
+    """Воркер: забирает шарды из очереди, пока они есть, и парсит их ScrapeEngine.
+
+    Аренда продлевается в фоне каждые lease/3 секунд; если её перехватил другой воркер,
+    текущий шард останавливается и не засчитывается.
+    """
+
+    def __init__(self, queue, output_dir, lease=600, owner=None, log=None, **engine_options):
+        self.queue = queue
+        self.output_dir = output_dir
+        self.lease = lease
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.log = log or print_log
+        self.engine_options = engine_options
+        self.engine = None
+        self._stopping = False
+        os.makedirs(output_dir, exist_ok=True)
+
+    def stop(self):
+        self._stopping = True
+        if self.engine:
+            self.engine.stop()
+
+    def _keep_lease(self, shard, done):
+        while not done.wait(self.lease / 3):
+            if not self.queue.renew(shard, self.owner, self.lease):
+                self.log(f"Аренда {shard} перехвачена другим воркером, останавливаемся")
+                self.engine.stop()
+                return
+
+    def run_shard(self, shard):
+        from src.engine import ScrapeEngine
+
+        output = os.path.join(self.output_dir, f"shard-{shard.id}-{shard.attempts}.jsonl")
+        log = lambda message, **context: self.log(f"[шард {shard.id}] {message}", **context)  # noqa: E731
+        writer = ShardWriter(output)
+        self.engine = ScrapeEngine(shard.url, writer=writer, log=log,
+                                   page_range=(shard.first_page, shard.last_page), **self.engine_options)
+        done = threading.Event()
+        keeper = threading.Thread(target=self._keep_lease, args=(shard, done), daemon=True)
+        keeper.start()
+        try:
+            rows = self.engine.run()
+        finally:
+            done.set()
+            keeper.join()
+            writer.close()
+        if self.engine.stop_parsing:
+            raise RuntimeError("шард остановлен до конца диапазона")
+        if not rows:
+            raise RuntimeError("в диапазоне не собрано ни одного товара")
+        return output, rows
+
+    def run(self):
+        """Обрабатывает шарды до пустой очереди; возвращает число собранных строк."""
+        total = 0
+        while not self._stopping:
+            shard = self.queue.claim(self.owner, self.lease)
+            if shard is None:
+                break
+            self.log(f"Взят {shard} (попытка {shard.attempts}): {shard.url}")
+            try:
+                output, rows = self.run_shard(shard)
+            except Exception as e:
+                status = self.queue.fail(shard, self.owner, e)
+                self.log(f"Ошибка, {shard} возвращён со статусом {status}: {e}")
+                continue
+            if self.queue.complete(shard, self.owner, output, rows):
+                total += rows
+                self.log(f"Готов {shard}: товаров {rows}")
+            else:
+                self.log(f"{shard} уже засчитан другому воркеру, результат не учитывается")
+        return total
+
+
+def merge(outputs, output_path, format_type):
+    """Сливает файлы шардов в один результат без повторов по ссылке товара.
+
+    Товар, попавший в два шарда (каталог сдвинулся между ними), берётся из первого.
+    Возвращает (строк записано, повторов пропущено).
+    """
+    seen = set()
+    duplicates = 0
+    writer = open_writer(output_path, format_type)
+    try:
+        for path in outputs:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    link = row.get('Ссылка')
+                    if link in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(link)
+                    writer.write(row)
+    finally:
+        writer.close()
+    return writer.rows, duplicates
+
+
+def _log(message, **context):
+    print(message, file=sys.stderr, flush=True)
+
+
+def _work(args):
+    # Каждый процесс со своим воркером и своими браузерами
+    queue = ShardQueue(args.queue)
+    worker = ShardWorker(queue, args.output_dir, lease=args.lease, log=_log, workers=args.browsers,
+                         http_engine=args.http, parse_processes=args.parse_processes, **block_options(args))
+    try:
+        return worker.run()
+    finally:
+        queue.close()
+
+
+def _work_process(args, results):
+    results.put(_work(args))
+
+
+def _work_processes(args):
+    """Запускает args.workers процессов-воркеров и возвращает, сколько товаров они собрали.
+
+    Обычные процессы, а не multiprocessing.Pool: процессы пула демонические и не могут
+    запускать свои дочерние, а ShardWorker с --parse-processes создаёт ParsePool.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [context.Process(target=_work_process, args=(args, results)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = sum(1 for process in processes if process.exitcode != 0)
+    if failed:
+        _log(f"Воркеров завершилось с ошибкой: {failed}; их шарды вернутся в очередь после аренды")
+    total = 0
+    for _ in range(len(processes) - failed):
+        total += results.get()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Обход каталога шардами с общей очередью и слиянием результатов")
+    parser.add_argument('--queue', default=None, help="файл очереди SQLite (по умолчанию в ~/.kaspifreesoft)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plan = commands.add_parser('plan', help="разбить каталоги на шарды")
+    plan.add_argument('urls', nargs='+')
+    plan.add_argument('--pages-per-shard', type=int, default=5)
+    plan.add_argument('--pages', type=int, help="страниц в каталоге; по умолчанию по пагинации")
+    add_block_arguments(plan)
+
+    work = commands.add_parser('work', help="забирать и парсить шарды, пока они есть")
+    work.add_argument('--workers', type=int, default=1, help="процессов-воркеров на этой машине")
+    work.add_argument('--browsers', type=int, default=3, help="сессий браузера у каждого воркера")
+    work.add_argument('--output-dir', default=app_path('shards'))
+    work.add_argument('--lease', type=float, default=600, help="аренда шарда, с")
+    work.add_argument('--http', action='store_true')
+    add_block_arguments(work)
+    work.add_argument('--parse-processes', type=int, default=0)
+
+    merge_cmd = commands.add_parser('merge', help="слить готовые шарды в один файл")
+    merge_cmd.add_argument('-o', '--output', required=True)
+    merge_cmd.add_argument('-f', '--format', help="формат; по умолчанию по расширению")
+    merge_cmd.add_argument('--url', help="только шарды этого каталога")
+
+    commands.add_parser('status', help="состояние очереди")
+    args = parser.parse_args(argv)
+
+    if args.command == 'work':
+        total = _work_processes(args) if args.workers > 1 else _work(args)
+        _log(f"Собрано товаров: {total}")
+        return 0
+
+    queue = ShardQueue(args.queue)
+    try:
+        if args.command == 'plan':
+            for url in args.urls:
+                pages = args.pages or count_pages(url, _log, **block_options(args))
+                added = queue.plan(url, pages, args.pages_per_shard)
+                _log(f"{url}: страниц {pages}, новых шардов {added}")
+        elif args.command == 'merge':
+            format_type = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+            rows, duplicates = merge(queue.outputs(args.url), args.output, format_type)
+            _log(f"Слито товаров: {rows}, пропущено повторов: {duplicates} -> {args.output}")
+        else:
+            _log(json.dumps(queue.stats(), ensure_ascii=False, indent=2))
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
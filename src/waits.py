@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import deque
+
+from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException,
+                                        TimeoutException)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+PRODUCT_READY = EC.any_of(
+    EC.presence_of_element_located((By.CSS_SELECTOR, "li.tabs-content__tab")),
+    EC.presence_of_element_located((By.CSS_SELECTOR, "ul.short-specifications")),
+    EC.presence_of_element_located((By.CSS_SELECTOR, "table.sellers-table__self")),
+)
+SELLERS_READY = EC.presence_of_element_located((By.CSS_SELECTOR, "table.sellers-table__self"))
+CHARACTERISTICS_READY = EC.presence_of_element_located((By.CSS_SELECTOR, "dl.specifications-list__el"))
+LISTING_READY = EC.presence_of_element_located((By.CLASS_NAME, "item-card__info"))
+FIRST_CARD_LINK = (By.CSS_SELECTOR, ".item-card__info a.item-card__name-link")
+
+
+def first_card_href(driver):
+    try:
+        return driver.find_element(*FIRST_CARD_LINK).get_attribute('href')
+    except (NoSuchElementException, StaleElementReferenceException):
+        return None
+
+
+def listing_changed(old_href):
+    """Условие: на странице каталога отрисовалась другая первая карточка."""
+    def condition(driver):
+        href = first_card_href(driver)
+        return href is not None and href != old_href
+    return condition
+
+
+class AdaptiveWaiter:
+    """Явные ожидания вместо фиксированных sleep.
+
+    Для каждого вида ожидания хранится окно последних длительностей; таймаут равен
+    p95 этого окна, умноженному на factor, в пределах [minimum, maximum]. Пока замеров
+    мало, используется initial. Если задан limiter (src/ratelimit.py), каждая загрузка
+    страницы через get() сначала берёт у него разрешение.
+
+    Необязательные блоки (required=False) ждём с отдельным коротким таймаутом: не больше
+    optional_initial, пока замеров мало, и optional_maximum потом. Если блока нет на
+    большинстве последних страниц, ждём его только minimum секунд.
+    """
+
+    def __init__(self, initial=10.0, minimum=2.0, maximum=30.0, factor=2.0, window=200, min_samples=10,
+                 poll=0.1, limiter=None, optional_initial=3.0, optional_maximum=5.0):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.min_samples = min_samples
+        self.poll = poll
+        self.limiter = limiter
+        self.optional_initial = optional_initial
+        self.optional_maximum = optional_maximum
+        self._window = window
+        self._samples = {}
+        self._misses = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self._window)).append(seconds)
+
+    def p95(self, name):
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def timeout(self, name):
+        with self._lock:
+            count = len(self._samples.get(name, ()))
+        if count < self.min_samples:
+            return self.initial
+        # Округляем до 0.5с, чтобы не менять таймаут драйвера на каждой странице
+        return min(self.maximum, max(self.minimum, round(self.p95(name) * self.factor * 2) / 2))
+
+    def _record_miss(self, name, missed):
+        with self._lock:
+            self._misses.setdefault(name, deque(maxlen=self._window)).append(missed)
+
+    def miss_rate(self, name):
+        with self._lock:
+            misses = list(self._misses.get(name, ()))
+        return sum(misses) / len(misses) if misses else None
+
+    def optional_timeout(self, name):
+        with self._lock:
+            checks = len(self._misses.get(name, ()))
+            count = len(self._samples.get(name, ()))
+        if checks >= self.min_samples and self.miss_rate(name) > 0.5:
+            return self.minimum
+        if count < self.min_samples:
+            return min(self.initial, self.optional_initial)
+        return min(self.optional_maximum, self.timeout(name))
+
+    def until(self, driver, condition, name, required=True):
+        """Ждёт condition не дольше адаптивного таймаута.
+
+        Если required=False, по таймауту возвращает None вместо исключения: так ждём
+        блоки, которых на странице может и не быть (продавцы, характеристики).
+        """
+        timeout = self.timeout(name) if required else self.optional_timeout(name)
+        started = time.perf_counter()
+        try:
+            result = WebDriverWait(driver, timeout, poll_frequency=self.poll,
+                                   ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+        except TimeoutException:
+            if required:
+                self.record(name, timeout)
+                raise
+            self._record_miss(name, True)
+            return None
+        self.record(name, time.perf_counter() - started)
+        if not required:
+            self._record_miss(name, False)
+        return result
+
+    def get(self, driver, url):
+        """driver.get с таймаутом загрузки по p95 прошлых загрузок."""
+        timeout = self.timeout('page_load')
+        if getattr(driver, 'adaptive_page_load_timeout', None) != timeout:
+            driver.set_page_load_timeout(timeout)
+            driver.adaptive_page_load_timeout = timeout
+        if self.limiter:
+            self.limiter.acquire()
+        started = time.perf_counter()
+        try:
+            driver.get(url)
+        finally:
+            self.record('page_load', time.perf_counter() - started)
+
+    def summary(self):
+        with self._lock:
+            names = sorted(self._samples)
+        parts = []
+        for name in names:
+            text = f"{name} p95={self.p95(name):.2f}с (таймаут {self.timeout(name):.1f}с)"
+            missed = self.miss_rate(name)
+            if missed:
+                text += f", блока нет на {missed:.0%} страниц"
+            parts.append(text)
+        return ", ".join(parts)
@@ -0,0 +1,297 @@
+import csv
+import json
+import os
+import threading
+
+from src.extract import CARD_FIELDS, INCOMPLETE_FIELD, MAX_SELLERS, OFFERS_FIELD, parse_price, parse_rating
+
+FORMATS = {
+    'xlsx': ("Excel files (*.xlsx)", "kaspi_data.xlsx"),
+    'csv': ("CSV files (*.csv)", "kaspi_data.csv"),
+    'json': ("JSON files (*.json)", "kaspi_data.json"),
+    'jsonl': ("JSON Lines files (*.jsonl)", "kaspi_data.jsonl"),
+    'parquet': ("Parquet files (*.parquet)", "kaspi_data.parquet"),
+}
+
+
+class RowWriter:
+    """Построчная запись результатов: каждая строка попадает на диск сразу после парсинга.
+
+    Набор колонок заранее неизвестен (характеристики у товаров разные), поэтому новые
+    колонки добавляются в конец по мере появления. Полный список продавцов
+    (OFFERS_FIELD) получают только писатели с keeps_offers.
+    """
+
+    keeps_offers = False
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = []
+        self.rows = 0
+        self._known = set()
+
+    def _track_columns(self, row):
+        added = False
+        for key in row:
+            if key not in self._known:
+                self._known.add(key)
+                self.columns.append(key)
+                added = True
+        return added
+
+    def write(self, row):
+        if not self.keeps_offers and OFFERS_FIELD in row:
+            row = {key: value for key, value in row.items() if key != OFFERS_FIELD}
+        self._track_columns(row)
+        self._write(row)
+        self.rows += 1
+
+    def _write(self, row):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvWriter(RowWriter):
+    """CSV с дописыванием строк. Если после первой строки появились новые колонки,
+    при закрытии файл один раз переписывается потоково с полным заголовком."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._header_written = 0
+
+    def _write(self, row):
+        if not self._header_written:
+            self._writer.writerow(self.columns)
+            self._header_written = len(self.columns)
+        self._writer.writerow([row.get(col, '') for col in self.columns])
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        if self._header_written and len(self.columns) > self._header_written:
+            self._rewrite_header()
+
+    def _rewrite_header(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, newline='', encoding='utf-8') as src, \
+                open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            next(reader, None)
+            writer.writerow(self.columns)
+            width = len(self.columns)
+            for values in reader:
+                writer.writerow(values + [''] * (width - len(values)))
+        os.replace(tmp_path, self.path)
+
+
+class JsonLinesWriter(RowWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonWriter(RowWriter):
+    """JSON-массив записей, как раньше давал df.to_json(orient='records')."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('[')
+
+    def _write(self, row):
+        self._file.write((',\n' if self.rows else '\n') + json.dumps(row, ensure_ascii=False))
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.write('\n]\n')
+        self._file.close()
+
+
+class XlsxWriter(RowWriter):
+    """XLSX через openpyxl в режиме write_only.
+
+    Пока идёт парсинг, строки пишутся во временный JSON Lines рядом с итоговым файлом
+    (после сбоя данные остаются в нём), а при закрытии за один проход переносятся в xlsx,
+    когда полный список колонок уже известен.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.spool_path = f"{path}.partial.jsonl"
+        self._spool = open(self.spool_path, 'w', encoding='utf-8')
+
+    def _write(self, row):
+        self._spool.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self._spool.flush()
+
+    def close(self):
+        if self._spool.closed:
+            return
+        self._spool.close()
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(self.columns)
+        with open(self.spool_path, encoding='utf-8') as spool:
+            for line in spool:
+                row = json.loads(line)
+                sheet.append([row.get(col) for col in self.columns])
+        workbook.save(self.path)
+        os.remove(self.spool_path)
+
+
+def companion_path(path, table):
+    """Дополнительная таблица рядом с основной: kaspi_data.parquet -> kaspi_data.specs.parquet."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{table}{ext}"
+
+
+class ParquetWriter(RowWriter):
+    """Типизированный вывод в Parquet (pyarrow) двумя таблицами.
+
+    Товары — по строке на товар с фиксированной схемой: цены и число отзывов целые, оценка дробная,
+    имена продавцов словарные (в pandas читаются как category). Характеристики, у каждого
+    товара свои, идут в длинную таблицу companion_path(path, 'specs'): ссылка,
+    характеристика, значение; все предложения продавцов — в companion_path(path, 'offers'):
+    ссылка, продавец, цена, место в списке. Строки копятся пачками по batch_size и
+    дописываются отдельными row group.
+    """
+
+    keeps_offers = True
+
+    def __init__(self, path, batch_size=2000):
+        super().__init__(path)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        category = pa.dictionary(pa.int32(), pa.string())
+        fields = [('Название', pa.string()), ('Ссылка', pa.string()), ('Цена', pa.int64()), ('Рейтинг', pa.float64()),
+                  ('Отзывы', pa.int64())]
+        for i in range(1, MAX_SELLERS + 1):
+            fields += [(f"Seller_{i}", category), (f"Price_{i}", pa.int64())]
+        fields.append((INCOMPLETE_FIELD, pa.bool_()))
+        self.schema = pa.schema(fields)
+        self.specs_schema = pa.schema([('Ссылка', pa.string()), ('Характеристика', category),
+                                       ('Значение', pa.string())])
+        self.offers_schema = pa.schema([('Ссылка', pa.string()), ('Продавец', category),
+                                        ('Цена', pa.int64()), ('Позиция', pa.int16())])
+        self.specs_path = companion_path(path, 'specs')
+        self.offers_path = companion_path(path, 'offers')
+        self.batch_size = batch_size
+        self._table = pa.Table.from_pydict
+        self._products = pq.ParquetWriter(path, self.schema, compression='zstd')
+        self._specs = pq.ParquetWriter(self.specs_path, self.specs_schema, compression='zstd')
+        self._offers = pq.ParquetWriter(self.offers_path, self.offers_schema, compression='zstd')
+        self._batch = {name: [] for name in self.schema.names}
+        self._spec_batch = {name: [] for name in self.specs_schema.names}
+        self._offer_batch = {name: [] for name in self.offers_schema.names}
+        self._pending = 0
+
+    def _write(self, row):
+        batch = self._batch
+        batch['Название'].append(row.get('Название'))
+        batch['Ссылка'].append(row.get('Ссылка'))
+        batch['Цена'].append(parse_price(row.get('Цена')))
+        batch['Рейтинг'].append(parse_rating(row.get('Рейтинг')))
+        batch['Отзывы'].append(row.get('Отзывы'))
+        batch[INCOMPLETE_FIELD].append(bool(row.get(INCOMPLETE_FIELD)))
+        sellers = {OFFERS_FIELD, INCOMPLETE_FIELD}
+        for i in range(1, MAX_SELLERS + 1):
+            seller, price = f"Seller_{i}", f"Price_{i}"
+            sellers.update((seller, price))
+            batch[seller].append(row.get(seller))
+            batch[price].append(parse_price(row.get(price)))
+        for key, value in row.items():
+            if key not in CARD_FIELDS and key not in sellers:
+                self._spec_batch['Ссылка'].append(row.get('Ссылка'))
+                self._spec_batch['Характеристика'].append(key)
+                self._spec_batch['Значение'].append(value if value is None else str(value))
+        for position, (seller, price) in enumerate(row.get(OFFERS_FIELD) or (), 1):
+            self._offer_batch['Ссылка'].append(row.get('Ссылка'))
+            self._offer_batch['Продавец'].append(seller)
+            self._offer_batch['Цена'].append(parse_price(price))
+            self._offer_batch['Позиция'].append(position)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._products.write_table(self._table(self._batch, schema=self.schema))
+        self._specs.write_table(self._table(self._spec_batch, schema=self.specs_schema))
+        self._offers.write_table(self._table(self._offer_batch, schema=self.offers_schema))
+        for values in (*self._batch.values(), *self._spec_batch.values(), *self._offer_batch.values()):
+            values.clear()
+        self._pending = 0
+
+    def close(self):
+        if self._products is None:
+            return
+        self._flush()
+        self._products.close()
+        self._specs.close()
+        self._offers.close()
+        self._products = self._specs = self._offers = None
+
+
+class SynchronizedWriter:
+    """Обёртка для одного файла, в который одновременно пишут несколько каталогов."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self):
+        return self.writer.rows
+
+    def write(self, row):
+        with self._lock:
+            self.writer.write(row)
+
+    def close(self):
+        with self._lock:
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+WRITERS = {
+    'xlsx': XlsxWriter,
+    'csv': CsvWriter,
+    'json': JsonWriter,
+    'jsonl': JsonLinesWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def open_writer(path, format_type):
+    return WRITERS[format_type](path)
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from src.extract import available_backends, extract_cards, extract_pagination
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def read_fixture(*parts):
+    with open(os.path.join(FIXTURES, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_pagination_last_page_has_no_next(backend):
+    html = read_fixture('listing', 'smartphones', 'page-3.html')
+    assert extract_pagination(html, backend) == (3, False)
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_pagination_middle_page_has_next(backend):
+    html = read_fixture('listing', 'smartphones', 'page-2.html')
+    assert extract_pagination(html, backend) == (3, True)
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_card_rating_comes_from_stars_not_review_count(backend):
+    cards, skipped = extract_cards(read_fixture('listing', 'tv_audio.html'), backend)
+    assert skipped == 0
+    assert (cards[0]['Рейтинг'], cards[0]['Отзывы']) == ('4.5', 1254)
+    assert (cards[1]['Рейтинг'], cards[1]['Отзывы']) == ('Нет рейтинга', None)
+
+
+def test_parquet_stores_rating_and_review_count(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    from src.writers import ParquetWriter
+
+    cards, _ = extract_cards(read_fixture('listing', 'tv_audio.html'))
+    path = str(tmp_path / 'cards.parquet')
+    writer = ParquetWriter(path)
+    for card in cards:
+        writer.write(card)
+    writer.close()
+    table = pq.read_table(path).to_pydict()
+    assert table['Рейтинг'] == [4.5, None]
+    assert table['Отзывы'] == [1254, None]